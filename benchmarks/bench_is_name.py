@@ -0,0 +1,38 @@
+import time
+from pathlib import Path
+from typing import Collection, List
+
+from catalan_common_voice_filter.filter_phrases import get_surname_list, is_name
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CORPUS = REPO_DIR / "tests" / "data" / "pujolar_twain.txt"
+
+
+def time_per_sentence(
+    sentences: List[str], surnames: Collection[str], repeats: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentence in sentences:
+            is_name(sentence, surnames)
+
+    return (time.perf_counter() - start) / (repeats * len(sentences))
+
+
+def main() -> None:
+    with open(CORPUS, "r") as f:
+        sentences = f.read().splitlines()
+
+    surnames = get_surname_list()
+
+    list_time = time_per_sentence(sentences, sorted(surnames), repeats=3)
+    set_time = time_per_sentence(sentences, surnames, repeats=300)
+
+    print(f"is_name over {len(sentences)} sentences of {CORPUS.name}")
+    print(f"- surname list: {round(list_time * 1e6, 2)} µs per sentence")
+    print(f"- surname frozenset: {round(set_time * 1e6, 2)} µs per sentence")
+    print(f"- speed-up: {round(list_time / set_time, 1)}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import hunspell
+
+from catalan_common_voice_filter.constants import DATA_DIR
+from catalan_common_voice_filter.lexicon import (
+    LEXICON_FILE_NAME,
+    Lexicon,
+    LexiconSpellChecker,
+)
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CORPUS = REPO_DIR / "tests" / "data" / "pujolar_twain.txt"
+
+
+def time_load(load: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    loaded = load()
+    return loaded, time.perf_counter() - start
+
+
+def time_per_word(words: List[str], spell: Callable[[str], Any], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for word in words:
+            spell(word)
+
+    return (time.perf_counter() - start) / (repeats * len(words))
+
+
+def main() -> None:
+    with open(CORPUS, "r") as f:
+        words = [word for word in re.findall(r"\w+", f.read()) if word.isalpha()]
+
+    lexicon_path = (
+        Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_DIR / LEXICON_FILE_NAME
+    )
+    if not lexicon_path.exists():
+        sys.exit(f"{lexicon_path} not found, build it first with: python lexicon.py")
+
+    dic, hunspell_load_time = time_load(
+        lambda: hunspell.HunSpell(str(DATA_DIR / "ca.dic"), str(DATA_DIR / "ca.aff"))
+    )
+    lexicon, lexicon_load_time = time_load(lambda: Lexicon(lexicon_path))
+    spell_checker = LexiconSpellChecker(lexicon, dic)
+
+    hunspell_time = time_per_word(words, dic.spell, repeats=3)
+    lexicon_time = time_per_word(words, lexicon.__contains__, repeats=3)
+    spell_checker_time = time_per_word(words, spell_checker.spell, repeats=1)
+
+    print(
+        f"Load time: Hunspell {round(hunspell_load_time * 1e3, 1)} ms, lexicon of "
+        f"{len(lexicon)} words {round(lexicon_load_time * 1e3, 3)} ms"
+    )
+    print(f"Spell check of {len(words)} words of {CORPUS.name}")
+    print(f"- Hunspell: {round(hunspell_time * 1e6, 2)} µs per word")
+    print(f"- lexicon lookup: {round(lexicon_time * 1e6, 2)} µs per word")
+    print(
+        f"- lexicon with Hunspell fallback: {round(spell_checker_time * 1e6, 2)} µs per word "
+        f"({spell_checker.fallbacks} of {len(words)} words checked by Hunspell)"
+    )
+
+
+if __name__ == "__main__":
+    main()
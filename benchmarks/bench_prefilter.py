@@ -0,0 +1,64 @@
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from catalan_common_voice_filter.filter_phrases import (
+    are_excluded_characters_in_line,
+    are_numbers_in_line,
+    are_time_expressions_in_line,
+    find_excluded_characters_hours_or_numbers,
+    split_filter_file_into_sentences,
+)
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CORPORA = [
+    REPO_DIR / "tests" / "data" / "frases_prova.txt",
+    REPO_DIR / "tests" / "data" / "pujolar_twain.txt",
+]
+
+
+def check_separately(line: str, numbers: bool) -> Optional[str]:
+    if are_excluded_characters_in_line(line):
+        return "excluded_characters"
+    if are_time_expressions_in_line(line):
+        return "excluded_hours"
+    if numbers and are_numbers_in_line(line):
+        return "excluded_nums"
+    return None
+
+
+def time_per_sentence(
+    sentences: List[str], check: Callable[[str, bool], Optional[str]], repeats: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentence in sentences:
+            check(sentence, True)
+
+    return (time.perf_counter() - start) / (repeats * len(sentences))
+
+
+def main() -> None:
+    for corpus in CORPORA:
+        sentences, _ = split_filter_file_into_sentences(corpus)
+        sentences = [sentence for sentence in sentences if sentence]
+        for sentence in sentences:
+            assert check_separately(sentence, True) == (
+                find_excluded_characters_hours_or_numbers(sentence, True)
+            )
+
+        separate_time = time_per_sentence(sentences, check_separately, repeats=100)
+        single_pass_time = time_per_sentence(
+            sentences, find_excluded_characters_hours_or_numbers, repeats=100
+        )
+
+        print(
+            f"Character, hour and number checks over {len(sentences)} sentences of {corpus.name}"
+        )
+        print(f"- separate checks: {round(separate_time * 1e6, 2)} µs per sentence")
+        print(f"- single pass: {round(single_pass_time * 1e6, 2)} µs per sentence")
+        print(f"- speed-up: {round(separate_time / single_pass_time, 1)}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+from pathlib import Path
+from typing import List
+
+from spacy.tokens import Doc
+
+from catalan_common_voice_filter.constants import REPLACEMENT_WORDS
+from catalan_common_voice_filter.filter_phrases import (
+    load_spacy_tokenizer,
+    replace_abbreviations,
+    split_filter_file_into_sentences,
+)
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CORPORA = [
+    REPO_DIR / "tests" / "data" / "frases_prova.txt",
+    REPO_DIR / "tests" / "data" / "pujolar_twain.txt",
+]
+
+
+def replace_abbreviations_per_token(doc: Doc, line: str) -> str:
+    # the replacement before the single pass, which went over the whole line once for
+    # every token that is an abbreviation
+    for token in doc:
+        if token.text.lower() in REPLACEMENT_WORDS.keys():
+            line = line.replace(token.text, REPLACEMENT_WORDS[token.text.lower()])
+
+    return line
+
+
+def main() -> None:
+    tokenizer = load_spacy_tokenizer(False)
+    for corpus in CORPORA:
+        sentences, _ = split_filter_file_into_sentences(corpus)
+        sentences = [sentence for sentence in sentences if sentence]
+        docs: List[Doc] = list(tokenizer.pipe(sentences))
+        repeats = 100
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for doc, sentence in zip(docs, sentences):
+                replace_abbreviations_per_token(doc, sentence)
+        per_token_time = (time.perf_counter() - start) / (repeats * len(sentences))
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for doc, sentence in zip(docs, sentences):
+                replace_abbreviations(doc, sentence)
+        single_pass_time = (time.perf_counter() - start) / (repeats * len(sentences))
+
+        # the per token replacement also replaced abbreviations inside other words, which
+        # the single pass only does for symbols like ’
+        changed = sum(
+            replace_abbreviations_per_token(doc, sentence)
+            != replace_abbreviations(doc, sentence)
+            for doc, sentence in zip(docs, sentences)
+        )
+
+        print(f"Abbreviations over {len(sentences)} sentences of {corpus.name}")
+        print(f"- per token: {round(per_token_time * 1e6, 2)} µs per sentence")
+        print(f"- single pass: {round(single_pass_time * 1e6, 2)} µs per sentence")
+        print(f"- speed-up: {round(per_token_time / single_pass_time, 1)}x")
+        print(f"- sentences replaced differently: {changed}")
+
+
+if __name__ == "__main__":
+    main()
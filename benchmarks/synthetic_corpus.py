@@ -0,0 +1,110 @@
+import random
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import List, NamedTuple, Sequence
+
+from catalan_common_voice_filter.constants import DATA_DIR, PUNCTUATION_TO_EXCLUDE
+from catalan_common_voice_filter.filter_phrases import split_filter_file_into_sentences
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CORPORA = [
+    REPO_DIR / "tests" / "data" / "frases_prova.txt",
+    REPO_DIR / "tests" / "data" / "pujolar_twain.txt",
+]
+
+FIRST_NAMES = ["Pere", "Maria", "Jordi", "Montserrat", "Joan", "Núria", "Pau", "Laia"]
+
+ACRONYMS = ["UNESCO", "ONU", "OTAN", "UPC", "CCCB", "MACBA", "RENFE", "IRPF"]
+
+
+class CorpusRates(NamedTuple):
+    # share of the sentences where each feature is inserted, independently of the others
+    numbers: float = 0.1
+    names: float = 0.05
+    acronyms: float = 0.05
+    bad_characters: float = 0.05
+
+
+def read_base_sentences() -> List[str]:
+    sentences, _ = split_filter_file_into_sentences([str(path) for path in CORPORA])
+    return [sentence for sentence in sentences if sentence.count(" ") >= 3]
+
+
+def read_surnames() -> List[str]:
+    with open(DATA_DIR / "cognoms_list.txt", "r") as f:
+        return [surname for surname in f.read().splitlines()[1:] if len(surname) >= 3]
+
+
+def insert_word(words: List[str], word: str, rng: random.Random) -> None:
+    # never before the first word, so the sentence keeps its capital letter
+    words.insert(rng.randint(1, len(words) - 1), word)
+
+
+def generate_sentence(
+    base_sentences: Sequence[str],
+    surnames: Sequence[str],
+    rates: CorpusRates,
+    rng: random.Random,
+) -> str:
+    words = rng.choice(base_sentences).split(" ")
+    if rng.random() < rates.numbers:
+        insert_word(words, str(rng.randint(1, 3000)), rng)
+    if rng.random() < rates.names:
+        insert_word(words, f"{rng.choice(FIRST_NAMES)} {rng.choice(surnames)}", rng)
+    if rng.random() < rates.acronyms:
+        insert_word(words, rng.choice(ACRONYMS), rng)
+    if rng.random() < rates.bad_characters:
+        insert_word(words, rng.choice(PUNCTUATION_TO_EXCLUDE), rng)
+
+    return " ".join(words)
+
+
+def generate_corpus(
+    size: int, rates: CorpusRates = CorpusRates(), seed: int = 0
+) -> List[str]:
+    # the same size, rates and seed always give the same corpus
+    rng = random.Random(seed)
+    base_sentences = read_base_sentences()
+    surnames = read_surnames()
+    return [
+        generate_sentence(base_sentences, surnames, rates, rng) for _ in range(size)
+    ]
+
+
+def write_corpus(path: Path, sentences: List[str]) -> None:
+    with open(path, "w") as f:
+        for sentence in sentences:
+            f.write(sentence + "\n")
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Writes a synthetic corpus made of the sentences of the test data, "
+        "one sentence per line"
+    )
+    parser.add_argument("-o", "--output", dest="output", required=True)
+    parser.add_argument(
+        "-s",
+        "--size",
+        dest="size",
+        type=int,
+        default=100000,
+        help="Number of sentences",
+    )
+    parser.add_argument("--seed", dest="seed", type=int, default=0)
+    defaults = CorpusRates()
+    for rate in CorpusRates._fields:
+        parser.add_argument(
+            f"--{rate.replace('_', '-')}-rate",
+            dest=rate,
+            type=float,
+            default=getattr(defaults, rate),
+        )
+    args = parser.parse_args()
+
+    rates = CorpusRates(*(getattr(args, rate) for rate in CorpusRates._fields))
+    write_corpus(Path(args.output), generate_corpus(args.size, rates, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# mypy: ignore-errors
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from synthetic_corpus import CorpusRates, generate_corpus, write_corpus
+
+from catalan_common_voice_filter.filter_phrases import (
+    PhraseFilter,
+    are_excluded_characters_in_line,
+    are_numbers_in_line,
+    are_time_expressions_in_line,
+    are_words_repeated,
+    find_excluded_characters_hours_or_numbers,
+    fix_apostrophes,
+    fix_quotation_marks,
+    get_surname_list,
+    is_name,
+    is_token_a_verb,
+    is_valid_single_letter_token,
+    prefilter_sentence,
+    remove_unnecessary_characters,
+    replace_abbreviations,
+    token_contains_numbers,
+    token_starts_with_lowercase_letter_and_is_not_a_pronoun,
+)
+
+# sentences of the corpora the checks and the whole filter are timed on
+CHECK_SENTENCES = 10000
+FILTER_SENTENCES = 2000
+
+SURNAMES = get_surname_list()
+
+LINE_CHECKS = {
+    "remove_unnecessary_characters": remove_unnecessary_characters,
+    "are_words_repeated": are_words_repeated,
+    "is_name": lambda line: is_name(line, SURNAMES),
+    "are_excluded_characters_in_line": are_excluded_characters_in_line,
+    "are_time_expressions_in_line": are_time_expressions_in_line,
+    "are_numbers_in_line": are_numbers_in_line,
+    "find_excluded_characters_hours_or_numbers": (
+        lambda line: find_excluded_characters_hours_or_numbers(line, True)
+    ),
+    "fix_apostrophes": fix_apostrophes,
+    "fix_quotation_marks": fix_quotation_marks,
+}
+
+TOKEN_CHECKS = {
+    "is_token_a_verb": is_token_a_verb,
+    "is_valid_single_letter_token": is_valid_single_letter_token,
+    "token_starts_with_lowercase_letter_and_is_not_a_pronoun": (
+        token_starts_with_lowercase_letter_and_is_not_a_pronoun
+    ),
+    "token_contains_numbers": token_contains_numbers,
+}
+
+
+@pytest.fixture(scope="module")
+def phrase_filter():
+    with PhraseFilter(numbers=True, verb=True, proper_nouns=True) as phrase_filter:
+        yield phrase_filter
+
+
+@pytest.fixture(scope="module")
+def check_corpus():
+    return generate_corpus(CHECK_SENTENCES)
+
+
+@pytest.fixture(scope="module")
+def filter_corpus():
+    return generate_corpus(FILTER_SENTENCES, CorpusRates(), seed=1)
+
+
+@pytest.fixture(scope="module")
+def docs(phrase_filter, check_corpus):
+    return list(phrase_filter.resources.spacy_tokenizer.pipe(check_corpus[:1000]))
+
+
+@pytest.fixture(scope="module")
+def tokens(docs):
+    return [token for doc in docs for token in doc]
+
+
+def run_over(items, check):
+    for item in items:
+        check(item)
+
+
+@pytest.mark.parametrize("check", LINE_CHECKS, ids=list(LINE_CHECKS))
+def test_line_check(benchmark, check, check_corpus):
+    benchmark.extra_info["sentences"] = len(check_corpus)
+    benchmark(run_over, check_corpus, LINE_CHECKS[check])
+
+
+@pytest.mark.parametrize("check", TOKEN_CHECKS, ids=list(TOKEN_CHECKS))
+def test_token_check(benchmark, check, tokens):
+    benchmark.extra_info["tokens"] = len(tokens)
+    benchmark(run_over, tokens, TOKEN_CHECKS[check])
+
+
+def test_replace_abbreviations(benchmark, docs):
+    benchmark.extra_info["sentences"] = len(docs)
+    benchmark(run_over, docs, lambda doc: replace_abbreviations(doc, doc.text))
+
+
+def test_spelling(benchmark, phrase_filter, tokens):
+    words = [token.text for token in tokens if token.text.isalpha()]
+    benchmark.extra_info["words"] = len(words)
+    # the dictionary behind the spelling cache, so every word is looked up
+    benchmark(run_over, words, phrase_filter.resources.dic.dic.spell)
+
+
+def test_prefilter_sentence(benchmark, phrase_filter, check_corpus):
+    benchmark.extra_info["sentences"] = len(check_corpus)
+    benchmark(
+        run_over,
+        check_corpus,
+        lambda line: prefilter_sentence(
+            line, phrase_filter.args, phrase_filter.resources
+        ),
+    )
+
+
+def test_phrase_filter(benchmark, phrase_filter, filter_corpus):
+    def filter_corpus_sentences():
+        start = time.perf_counter()
+        list(phrase_filter.filter_many(filter_corpus))
+        return len(filter_corpus) / (time.perf_counter() - start)
+
+    sentences_per_second = benchmark.pedantic(filter_corpus_sentences, rounds=3)
+    benchmark.extra_info["sentences"] = len(filter_corpus)
+    benchmark.extra_info["sentences_per_second"] = round(sentences_per_second, 1)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_filter_phrases(benchmark, tmp_path, filter_corpus, workers):
+    corpus = tmp_path / "corpus.txt"
+    write_corpus(corpus, filter_corpus)
+
+    def run_filter_phrases():
+        # the filter runs in its own process, so its peak RSS is not that of pytest
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "catalan_common_voice_filter.filter_phrases",
+                "-f",
+                str(corpus),
+                "-d",
+                str(tmp_path / f"output_{workers}"),
+                "-n",
+                "-v",
+                "-pn",
+                "-w",
+                str(workers),
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        assert process.returncode == 0
+        return time.perf_counter() - start, usage.ru_maxrss
+
+    seconds, peak_rss_kb = benchmark.pedantic(run_filter_phrases, rounds=1)
+    benchmark.extra_info["sentences"] = len(filter_corpus)
+    benchmark.extra_info["sentences_per_second"] = round(
+        len(filter_corpus) / seconds, 1
+    )
+    # ru_maxrss is in kilobytes on Linux, the largest of the filter and its workers
+    benchmark.extra_info["peak_rss_mb"] = round(peak_rss_kb / 1024, 1)
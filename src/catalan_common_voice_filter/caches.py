@@ -0,0 +1,119 @@
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+PERSISTENT_STORE_COMMIT_INTERVAL = 100
+
+# seconds a write waits for the other processes sharing the store before it is skipped
+PERSISTENT_STORE_TIMEOUT = 60
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get(self, key: K) -> Optional[V]:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PersistentStore:
+    def __init__(
+        self, path: Path, table: str, timeout: float = PERSISTENT_STORE_TIMEOUT
+    ) -> None:
+        self.path = path
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.skipped_writes = 0
+        # the writes are kept in memory and written together on commit, so the write
+        # lock, which the workers sharing the store wait for, is only held while writing
+        self._pending_writes: Dict[str, str] = {}
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        # in WAL mode the workers can read the store while another one writes to it
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._connection.commit()
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._pending_writes:
+            return True
+
+        row = self._connection.execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self._pending_writes:
+            self.hits += 1
+            return self._pending_writes[key]
+
+        row = self._connection.execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return str(row[0])
+
+    def put(self, key: str, value: str) -> None:
+        self._pending_writes[key] = value
+        if len(self._pending_writes) >= PERSISTENT_STORE_COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self) -> None:
+        if not self._pending_writes:
+            return
+
+        # a store is a cache, so writes that time out waiting for the lock are lost
+        # instead of stopping the run
+        try:
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                    self._pending_writes.items(),
+                )
+        except sqlite3.OperationalError as err:
+            self.skipped_writes += len(self._pending_writes)
+            logging.warning(
+                f"{len(self._pending_writes)} writes to {self.path} skipped: {err}"
+            )
+        self._pending_writes = {}
+
+    def close(self) -> None:
+        self.commit()
+        self._connection.close()
@@ -0,0 +1,156 @@
+import json
+import os
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from catalan_common_voice_filter.dedup import DeduplicationIndex
+from catalan_common_voice_filter.output import CaseStudyFile, CategoryFile
+
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+
+DEDUP_CHECKPOINT_FILE_NAME = "checkpoint.dedup"
+
+
+class InputPosition(NamedTuple):
+    # where the input is left after reading a line, and how much had been read
+    file: int
+    offset: int
+    lines: int
+    sentences: int
+    total_sentences: int
+
+
+class Checkpoint(NamedTuple):
+    files: List[str]
+    # the filter fingerprint of the run, which a resumed run must have as well
+    fingerprint: str
+    every: int
+    filtered: int
+    position: InputPosition
+    source_counts: List[Tuple[str, "Counter[str]"]]
+    # size in bytes and number of lines of every results file
+    results: Dict[str, Tuple[int, int]]
+    case_studies: Dict[str, Tuple[int, int]]
+    dedup_size: int
+    previous_runs_hits: int
+
+
+def read_checkpoint(output_dir: Path) -> Checkpoint:
+    with open(output_dir / CHECKPOINT_FILE_NAME, "r") as f:
+        checkpoint = json.load(f)
+
+    return Checkpoint(
+        checkpoint["files"],
+        checkpoint["fingerprint"],
+        checkpoint["every"],
+        checkpoint["filtered"],
+        InputPosition(**checkpoint["position"]),
+        [(source, Counter(counts)) for source, counts in checkpoint["source_counts"]],
+        {name: (size, count) for name, (size, count) in checkpoint["results"].items()},
+        {
+            name: (size, count)
+            for name, (size, count) in checkpoint["case_studies"].items()
+        },
+        checkpoint["dedup_size"],
+        checkpoint["previous_runs_hits"],
+    )
+
+
+def write_checkpoint(output_dir: Path, checkpoint: Checkpoint) -> None:
+    # the checkpoint is replaced at once, so a run killed while writing it keeps the previous one
+    path = output_dir / CHECKPOINT_FILE_NAME
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "w") as f:
+        json.dump(
+            {
+                **checkpoint._asdict(),
+                "position": checkpoint.position._asdict(),
+            },
+            f,
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+def remove_checkpoint(output_dir: Path) -> None:
+    for name in [CHECKPOINT_FILE_NAME, DEDUP_CHECKPOINT_FILE_NAME]:
+        if (output_dir / name).exists():
+            os.remove(output_dir / name)
+
+
+class Checkpointer:
+    def __init__(
+        self,
+        output_dir: Path,
+        every: int,
+        files: List[str],
+        fingerprint: str,
+        positions: "deque[InputPosition]",
+        source_counts: List[Tuple[str, "Counter[str]"]],
+        results: Mapping[str, CategoryFile],
+        case_studies: Mapping[str, CaseStudyFile],
+        selected_index: DeduplicationIndex,
+        filtered: int = 0,
+    ) -> None:
+        self.output_dir = output_dir
+        self.every = every
+        self.files = files
+        self.fingerprint = fingerprint
+        self.positions = positions
+        self.source_counts = source_counts
+        self.results = results
+        self.case_studies = case_studies
+        self.selected_index = selected_index
+        self.filtered = filtered
+        self.next_checkpoint = filtered + every
+        self.position: Optional[InputPosition] = None
+
+    def add(self) -> None:
+        # called after the verdict of every sentence has been added to the results
+        self.filtered += 1
+        while self.positions and self.positions[0].total_sentences <= self.filtered:
+            self.position = self.positions.popleft()
+
+        # a checkpoint can only be made once all the sentences of a line have been filtered
+        if (
+            self.filtered >= self.next_checkpoint
+            and self.position is not None
+            and self.position.total_sentences == self.filtered
+        ):
+            self.write(self.position)
+            self.next_checkpoint = self.filtered + self.every
+
+    def write(self, position: InputPosition) -> None:
+        # the sentences read after the position are not in the checkpoint
+        source_counts = [
+            (source, Counter(counts))
+            for source, counts in self.source_counts[: position.file + 1]
+        ]
+        source_counts[-1][1]["lines"] = position.lines
+        source_counts[-1][1]["sentences"] = position.sentences
+
+        write_checkpoint(
+            self.output_dir,
+            Checkpoint(
+                self.files,
+                self.fingerprint,
+                self.every,
+                self.filtered,
+                position,
+                source_counts,
+                {
+                    name: (results.flush(), len(results))
+                    for name, results in self.results.items()
+                },
+                {
+                    name: (case_studies.flush(), len(case_studies))
+                    for name, case_studies in self.case_studies.items()
+                },
+                self.selected_index.write_checkpoint(
+                    self.output_dir / DEDUP_CHECKPOINT_FILE_NAME
+                ),
+                self.selected_index.previous_runs_hits,
+            ),
+        )
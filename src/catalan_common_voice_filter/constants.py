@@ -1,4 +1,8 @@
 import re
+from pathlib import Path
+
+# the Hunspell dictionary and the surname list
+DATA_DIR = Path(__file__).resolve().parent / "data"
 
 PUNCTUATION_TO_EXCLUDE = [
     "|",
@@ -34,6 +38,27 @@ REPEATED_WORDS = re.compile(r"\b(\w+)\b\s+(\1)\b")
 
 HOURS = re.compile(r"[0-2]?[0-9](:|\.)[0-5][0-9](?![0-9])")
 
+CHARACTERS_IN_PARENTHESES = re.compile(r" \([A-Úa-ú0-9 -\.\,]*\)")
+
+EXCLUDED_CHARACTERS = (
+    "["
+    + re.escape("".join(PUNCTUATION_TO_EXCLUDE))
+    + EMOJIS.pattern[1:-1]
+    + r"]|\.[a-zA-Z]|:\Z| - "
+)
+
+# the groups are named after the lists the sentences are excluded to, and the alternatives
+# are in the order they are checked, so an hour is not taken for a number
+CHARACTERS_AND_HOURS = re.compile(
+    rf"(?P<excluded_characters>{EXCLUDED_CHARACTERS})|(?P<excluded_hours>{HOURS.pattern})"
+)
+
+CHARACTERS_HOURS_AND_NUMBERS = re.compile(
+    rf"{CHARACTERS_AND_HOURS.pattern}|(?P<excluded_nums>[0-9])"
+)
+
+POSSIBLE_NAMES = re.compile(r"[A-Z][a-ü]+ ([Dd][\'e](l)?)? ?[A-Z][a-ü]*")
+
 # words that should not end a sentence
 INCORRECT_SENTENCE_END_WORDS = [
     "els",
@@ -159,3 +184,74 @@ REPLACEMENT_WORDS = {
 }
 
 QUOTATION_MARKS = ["‘", "’", "“", '"', "”", "«", "»"]
+
+# Catalan renderings of the words lingua_franca uses to pronounce numbers in English
+CATALAN_NUMBER_WORDS = {
+    "zero": "zero",
+    "one": "un",
+    "two": "dos",
+    "three": "tres",
+    "four": "quatre",
+    "five": "cinc",
+    "six": "sis",
+    "seven": "set",
+    "eight": "vuit",
+    "nine": "nou",
+    "ten": "deu",
+    "eleven": "onze",
+    "twelve": "dotze",
+    "thirteen": "tretze",
+    "fourteen": "catorze",
+    "fifteen": "quinze",
+    "sixteen": "setze",
+    "seventeen": "disset",
+    "eighteen": "divuit",
+    "nineteen": "dinou",
+    "twenty": "vint",
+    "thirty": "trenta",
+    "forty": "quaranta",
+    "fifty": "cinquanta",
+    "sixty": "seixanta",
+    "seventy": "setanta",
+    "eighty": "vuitanta",
+    "ninety": "noranta",
+    "hundred": "cent",
+    "thousand": "mil",
+    "million": "milió",
+    "billion": "mil milions",
+    "trillion": "bilió",
+    "and": "i",
+    "minus": "menys",
+    "first": "primer",
+    "second": "segon",
+    "third": "tercer",
+    "fourth": "quart",
+    "fifth": "cinquè",
+    "sixth": "sisè",
+    "seventh": "setè",
+    "eighth": "vuitè",
+    "ninth": "novè",
+    "tenth": "desè",
+    "eleventh": "onzè",
+    "twelfth": "dotzè",
+    "thirteenth": "tretzè",
+    "fourteenth": "catorzè",
+    "fifteenth": "quinzè",
+    "sixteenth": "setzè",
+    "seventeenth": "dissetè",
+    "eighteenth": "divuitè",
+    "nineteenth": "dinovè",
+    "twentieth": "vintè",
+    "thirtieth": "trentè",
+    "fortieth": "quarantè",
+    "fiftieth": "cinquantè",
+    "sixtieth": "seixantè",
+    "seventieth": "setantè",
+    "eightieth": "vuitantè",
+    "ninetieth": "norantè",
+    "hundredth": "centè",
+    "thousandth": "milè",
+    "millionth": "milionèsim",
+    "billionth": "mil milionèsim",
+    "trillionth": "bilionèsim",
+}
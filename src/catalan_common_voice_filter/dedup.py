@@ -0,0 +1,79 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Set
+
+DIGEST_SIZE = 16
+
+
+def hash_sentence(sentence: str) -> bytes:
+    return hashlib.blake2b(sentence.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+class DeduplicationIndex:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.previous_runs_hits = 0
+        self._digests: Set[bytes] = set()
+        self._previous_digests: Set[bytes] = set()
+        self._new_digests: List[bytes] = []
+        self._checkpointed_digests = 0
+
+        if path is not None and path.exists():
+            self._previous_digests = self._load(path)
+
+    @staticmethod
+    def _read_digests(path: Path) -> List[bytes]:
+        with open(path, "rb") as f:
+            data = f.read()
+
+        return [data[i : i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+    @classmethod
+    def _load(cls, path: Path) -> Set[bytes]:
+        return set(cls._read_digests(path))
+
+    def __len__(self) -> int:
+        return len(self._digests) + len(self._previous_digests)
+
+    def add(self, sentence: str) -> bool:
+        digest = hash_sentence(sentence)
+        if digest in self._digests:
+            return False
+        if digest in self._previous_digests:
+            self.previous_runs_hits += 1
+            return False
+
+        self._digests.add(digest)
+        self._new_digests.append(digest)
+        return True
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        os.makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(self._new_digests))
+        self._previous_digests.update(self._new_digests)
+        self._digests.difference_update(self._new_digests)
+        self._new_digests = []
+
+    def write_checkpoint(self, path: Path) -> int:
+        # the digests added since the last checkpoint are appended to the ones before
+        with open(path, "ab") as f:
+            f.write(b"".join(self._new_digests[self._checkpointed_digests :]))
+            f.flush()
+            os.fsync(f.fileno())
+            self._checkpointed_digests = len(self._new_digests)
+            return f.tell()
+
+    def resume(self, path: Path, size: int, previous_runs_hits: int) -> None:
+        # the digests written after the checkpoint the run resumes from are discarded
+        if not path.exists():
+            open(path, "wb").close()
+        os.truncate(path, size)
+        self._new_digests = self._read_digests(path)
+        self._digests = set(self._new_digests)
+        self._checkpointed_digests = len(self._new_digests)
+        self.previous_runs_hits = previous_runs_hits
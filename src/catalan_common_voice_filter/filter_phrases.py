@@ -1,36 +1,219 @@
 import logging
+import multiprocessing
 import os
 import re
-import subprocess
 from argparse import ArgumentParser, Namespace
-from collections import Counter
+from collections import Counter, deque
 from datetime import datetime
+from functools import partial
+from multiprocessing.pool import AsyncResult, Pool
 from pathlib import Path
-from typing import List, Match, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Match,
+    NamedTuple,
+    Optional,
+    Sized,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import hunspell
 import lingua_franca
 import spacy
 import unidecode
-from lingua_franca.format import pronounce_number
 from sentence_splitter import SentenceSplitter
+from spacy.language import Language
 from spacy.tokens import Doc
 from spacy.tokens.token import Token
 
+from catalan_common_voice_filter.checkpoint import (
+    CHECKPOINT_FILE_NAME,
+    DEDUP_CHECKPOINT_FILE_NAME,
+    Checkpoint,
+    Checkpointer,
+    InputPosition,
+    read_checkpoint,
+    remove_checkpoint,
+)
 from catalan_common_voice_filter.constants import (
+    CHARACTERS_AND_HOURS,
+    CHARACTERS_HOURS_AND_NUMBERS,
+    CHARACTERS_IN_PARENTHESES,
+    DATA_DIR,
     EMOJIS,
     HOURS,
     INCORRECT_SENTENCE_END_WORDS,
     NUMBERS,
+    POSSIBLE_NAMES,
     PUNCTUATION_TO_EXCLUDE,
     QUOTATION_MARKS,
     REPEATED_WORDS,
     REPLACEMENT_WORDS,
     SENTENCE_END_CHARS,
 )
+from catalan_common_voice_filter.dedup import DeduplicationIndex
+from catalan_common_voice_filter.input_files import (
+    INPUT_ENCODING,
+    STDIN,
+    expand_input_paths,
+    get_input_name,
+    read_input_lines,
+)
+from catalan_common_voice_filter.lexicon import (
+    Lexicon,
+    LexiconSpellChecker,
+    describe_lexicon,
+)
+from catalan_common_voice_filter.number_transcription import (
+    NUMBER_BACKENDS,
+    NUMBER_CACHE_FILE_NAME,
+    NUMBER_CACHE_SIZE,
+    NumberTranscriber,
+    describe_number_transcription,
+    find_numbers,
+    transcribe_number_in_catalan,
+)
+from catalan_common_voice_filter.output import (
+    OUTPUT_COMPRESSIONS,
+    SORT_RUN_SIZE,
+    CaseStudyFile,
+    CategoryFile,
+    compress_file,
+    run_in_threads,
+    sort_file,
+    write_lines,
+)
+from catalan_common_voice_filter.phrase_automaton import PhraseAutomaton
+from catalan_common_voice_filter.profiling import (
+    Profile,
+    collect_function_profile,
+    describe_profile,
+    profile_stage,
+    start_function_profiling,
+    write_profile,
+)
+from catalan_common_voice_filter.records import (
+    RECORD_FORMATS,
+    RecordFile,
+    SentenceRecord,
+    SentenceSource,
+    open_record_file,
+)
+from catalan_common_voice_filter.spelling import (
+    SPELLING_CACHE_SIZE,
+    CachedSpellChecker,
+    describe_spelling,
+    read_word_frequency_list,
+)
+from catalan_common_voice_filter.verdict_store import (
+    VerdictStore,
+    create_fingerprint,
+    describe_verdict_store,
+)
 
 logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
+T = TypeVar("T")
+
+SENTENCE_CHUNK_SIZE = 1000
+
+# number of lines sent to a splitting worker at a time
+SPLIT_CHUNK_LINES = 500
+
+SPACY_BATCH_SIZE = 1000
+
+SPACY_MODEL = "ca_core_news_sm"
+
+# the options that change the verdict of a sentence
+FINGERPRINT_OPTIONS = [
+    "capitals",
+    "punctuation",
+    "proper_nouns",
+    "numbers",
+    "verb",
+    "number_backend",
+    "list_casefold",
+]
+
+TAGGER_EXCLUDED_COMPONENTS = ["parser", "attribute_ruler", "lemmatizer", "ner"]
+
+# without --verb only the tokenizer is used, so none of the statistical components are loaded
+TOKENIZER_EXCLUDED_COMPONENTS = TAGGER_EXCLUDED_COMPONENTS + [
+    "tok2vec",
+    "morphologizer",
+    "tagger",
+    "senter",
+    "trainable_lemmatizer",
+]
+
+# the lists where the sentences are saved depending on whether they are discarded or not,
+# with the file each of them is written to
+OUTPUT_FILES = {
+    "selected_phrases": "selected_phrases.txt",
+    "excluded_sentences_improper_length": "excluded_improper_length.txt",
+    "excluded_characters": "excluded_characters.txt",
+    "excluded_acronyms": "excluded_acronyms.txt",
+    "excluded_words": "excluded_words.txt",
+    "excluded_spellings": "excluded_spelling.txt",
+    "excluded_ratios": "excluded_proportion_of_proper_nouns.txt",
+    "excluded_hours": "excluded_hours.txt",
+    "excluded_repeated_words": "excluded_repeated_words.txt",
+    "excluded_names": "excluded_names.txt",
+    "selected_phrases_repeated": "selected_repeated_phrases.txt",
+    "error_num": "number_transcription_errors.txt",
+    "possible_breaks": "excluded_possible_breaks.txt",
+    "excluded_abbreviations": "excluded_abbreviations.txt",
+    "excluded_lowercase": "excluded_lowercase.txt",
+    "excluded_nums": "excluded_numbers.txt",
+    "excluded_verbs": "excluded_verbs.txt",
+    "selected_phrases_orig": "selected_original_phrases.txt",
+}
+
+CASE_STUDY_FILES = {
+    "case_studies": "filter_case_study.tsv",
+    "spelling_case_studies": "spelling_case_study.tsv",
+}
+
+
+class FilterResources(NamedTuple):
+    dic: CachedSpellChecker
+    spacy_tokenizer: Language
+    surnames: FrozenSet[str]
+    words_to_exclude: Collection[str]
+    number_transcriber: NumberTranscriber
+    profile: Optional[Profile] = None
+    excluded_phrases: Optional[PhraseAutomaton] = None
+
+
+class PrefilteredSentence(NamedTuple):
+    original_phrase: str
+    line: str
+    exclusions: List[str]
+
+
+class SentenceVerdict(NamedTuple):
+    original_phrase: str
+    exclusions: List[str]
+    selected_phrase: Optional[str] = None
+    case_study: Optional[Tuple[str, str]] = None
+
+
+class FilterResult(NamedTuple):
+    accepted: bool
+    reason: Optional[str]
+    normalized_text: Optional[str]
+
 
 def add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
     line: str, exclusion_list: List[str], exclude_phrase: bool
@@ -40,15 +223,15 @@ def add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
     return exclusion_list, exclude_phrase
 
 
-def get_surname_list() -> List[str]:
-    with open(Path("data/cognoms_list.txt"), "r") as f:
+def get_surname_list() -> FrozenSet[str]:
+    with open(DATA_DIR / "cognoms_list.txt", "r") as f:
         all_surnames = f.read().splitlines()
 
-    surnames = [surname for surname in all_surnames if len(surname) >= 3]
+    surnames = frozenset(surname for surname in all_surnames if len(surname) >= 3)
     return surnames
 
 
-def describe(descriptor: str, exclusion_list: List[str], total: int) -> str:
+def describe(descriptor: str, exclusion_list: Sized, total: int) -> str:
     text = (
         descriptor
         + " "
@@ -65,14 +248,13 @@ def create_file(
     filter_file_name: str,
     statistics_file_name: str,
     exclusion_list: List[str],
+    compression: Optional[str] = None,
 ) -> None:
     exclusion_list.sort()
 
     os.makedirs(output_dir, exist_ok=True)
     new_file = output_dir / f"{filter_file_name}_{statistics_file_name}"
-    with open(new_file, "w") as f:
-        for frase in exclusion_list:
-            f.writelines(frase + "\n")
+    write_lines(new_file, exclusion_list, compression)
 
 
 def fix_apostrophes(line: str) -> str:
@@ -134,41 +316,264 @@ def store_and_print_selected_options(
 
 
 def create_output_directory_path(
-    output_dir: Union[str, None], file_to_filter: Path
+    output_dir: Union[str, None],
+    file_to_filter: Path,
+    filter_file_name: Union[str, None] = None,
 ) -> Path:
     if output_dir:
         return Path(output_dir)
 
     now = datetime.now().strftime("%Y%m%d_%H%M")
-    return file_to_filter.parent / f"filter_results_{file_to_filter.stem}_{now}"
+    name = filter_file_name or file_to_filter.stem
+    return file_to_filter.parent / f"filter_results_{name}_{now}"
 
 
-def create_excluded_words_list(excluded_words_list_file: Union[str, None]) -> List[str]:
+def get_filter_file_name(files_to_filter: List[str]) -> str:
+    name = get_input_name(files_to_filter[0])
+    if len(files_to_filter) == 1:
+        return name
+
+    return f"{name}_and_{len(files_to_filter) - 1}_more"
+
+
+def create_number_cache_path(
+    number_cache: Union[str, None],
+    no_number_cache: bool,
+    output_dir: Path,
+    default_output_dir: bool = False,
+) -> Union[Path, None]:
+    if no_number_cache:
+        return None
+    if number_cache:
+        return Path(number_cache)
+
+    # a default output directory has the time of the run in its name, so the cache is
+    # kept next to it, where reruns of the same input find it. A --dir is kept as is
+    if default_output_dir:
+        return output_dir.parent / NUMBER_CACHE_FILE_NAME
+    return output_dir / NUMBER_CACHE_FILE_NAME
+
+
+def read_excluded_words_list(excluded_words_list_file: Union[str, None]) -> List[str]:
     words_to_exclude = []
     if excluded_words_list_file:
         excluded_words_list_path = Path(excluded_words_list_file)
         with open(excluded_words_list_path, "r") as f:
             words_to_exclude = f.read().splitlines()
 
-    return words_to_exclude
+    return [word.strip() for word in words_to_exclude if word.strip()]
 
 
-def split_filter_file_into_sentences(file_to_filter: Path) -> Tuple[List[str], int]:
-    splitter = SentenceSplitter(language="ca")
+def create_excluded_words_list(
+    excluded_words_list_file: Union[str, None], casefold: bool = False
+) -> FrozenSet[str]:
+    # the single words of the list, which are looked up for every token
+    return frozenset(
+        word.casefold() if casefold else word
+        for word in read_excluded_words_list(excluded_words_list_file)
+        if " " not in word
+    )
+
 
-    with open(file_to_filter, "r") as f:
-        file_lines = f.readlines()
+def create_excluded_phrase_automaton(
+    excluded_words_list_file: Union[str, None], casefold: bool = False
+) -> Optional[PhraseAutomaton]:
+    # the phrases of several words of the list, which are searched in the whole sentence
+    phrases = [
+        word
+        for word in read_excluded_words_list(excluded_words_list_file)
+        if " " in word
+    ]
+    if not phrases:
+        return None
+
+    return PhraseAutomaton(phrases, casefold)
+
+
+_worker_splitter: Optional[SentenceSplitter] = None
+
+
+def _initialize_split_worker() -> None:
+    global _worker_splitter
+
+    _worker_splitter = SentenceSplitter(language="ca")
+
+
+def _split_lines_in_worker(lines: List[str]) -> List[List[str]]:
+    assert _worker_splitter is not None
+    return [_worker_splitter.split(line) for line in lines]
+
+
+def split_lines(
+    lines: Iterable[Tuple[str, int]],
+    splitter: SentenceSplitter,
+    pool: Optional[Pool] = None,
+    pool_size: int = 0,
+) -> Iterator[Tuple[List[str], str, int]]:
+    # the phrases of every line, with the line and its offset, in the order of the lines
+    if pool is None:
+        for line, offset in lines:
+            yield splitter.split(line), line, offset
+        return
+
+    # only a few chunks per worker are split ahead, so splitting runs while the
+    # sentences already split are filtered without reading the whole input
+    pending: "deque[Tuple[AsyncResult[List[List[str]]], List[Tuple[str, int]]]]" = (
+        deque()
+    )
+    for chunk in split_into_chunks(lines, SPLIT_CHUNK_LINES):
+        pending.append(
+            (
+                pool.apply_async(
+                    _split_lines_in_worker, ([line for line, _ in chunk],)
+                ),
+                chunk,
+            )
+        )
+        if len(pending) < pool_size * 2:
+            continue
+
+        split_chunk, chunk = pending.popleft()
+        for phrases, (line, offset) in zip(split_chunk.get(), chunk):
+            yield phrases, line, offset
+
+    while pending:
+        split_chunk, chunk = pending.popleft()
+        for phrases, (line, offset) in zip(split_chunk.get(), chunk):
+            yield phrases, line, offset
+
+
+def find_sentence_offsets(
+    line: str, sentences: List[str], line_offset: int
+) -> List[int]:
+    # the byte offset in the input of every sentence of a line, looking for them in
+    # order, or the offset of the line for sentences that are not in it as they are
+    sentence_offsets = []
+    position = 0
+    for sentence in sentences:
+        found = line.find(sentence, position) if sentence else -1
+        if found == -1:
+            sentence_offsets.append(line_offset)
+            continue
+
+        sentence_offsets.append(line_offset + len(line[:found].encode(INPUT_ENCODING)))
+        position = found + len(sentence)
+    return sentence_offsets
+
+
+def read_sentences(
+    files_to_filter: Iterable[Union[str, Path]],
+    source_counts: List[Tuple[str, "Counter[str]"]],
+    start: Optional[InputPosition] = None,
+    positions: Optional["deque[InputPosition]"] = None,
+    split_workers: int = 0,
+    sources: Optional["deque[SentenceSource]"] = None,
+) -> Iterator[str]:
+    # the counts of every file are added to source_counts when it starts being read, and
+    # when resuming from start, source_counts has the counts of the files read until then.
+    # The source of every sentence is added to sources before it is yielded
+    splitter = SentenceSplitter(language="ca")
+    total_sentences = sum(counts["sentences"] for _, counts in source_counts)
+    pool = (
+        multiprocessing.Pool(split_workers, initializer=_initialize_split_worker)
+        if split_workers
+        else None
+    )
 
-    sentences = []
-    total_lines = 0
-    for line in file_lines:
-        total_lines += 1
-        phrases = splitter.split(line)
-        for phrase in phrases:
-            parts = phrase.split(":")
-            sentences.append(parts[-1])
+    try:
+        for index, file_to_filter in enumerate(files_to_filter):
+            if start is not None and index < start.file:
+                continue
 
-    return sentences, total_lines
+            if start is not None and index == start.file:
+                counts = source_counts[index][1]
+            else:
+                counts = Counter()
+                source_counts.append((str(file_to_filter), counts))
+            line_offset = 0
+            if start is not None and index == start.file:
+                line_offset = start.offset
+            offsets = positions is not None or (
+                sources is not None and str(file_to_filter) != STDIN
+            )
+            lines = read_input_lines(file_to_filter, line_offset, offsets)
+            for phrases, line, offset in split_lines(
+                lines, splitter, pool, split_workers
+            ):
+                counts["lines"] += 1
+                total_sentences += len(phrases)
+                if positions is not None:
+                    positions.append(
+                        InputPosition(
+                            index,
+                            offset,
+                            counts["lines"],
+                            counts["sentences"] + len(phrases),
+                            total_sentences,
+                        )
+                    )
+                sentences = [phrase.split(":")[-1] for phrase in phrases]
+                if sources is not None:
+                    sentence_offsets: Iterable[Optional[int]] = (
+                        find_sentence_offsets(line, sentences, line_offset)
+                        if offsets
+                        else [None] * len(sentences)
+                    )
+                    sources.extend(
+                        SentenceSource(
+                            str(file_to_filter), counts["lines"], sentence_offset
+                        )
+                        for sentence_offset in sentence_offsets
+                    )
+                for sentence in sentences:
+                    counts["sentences"] += 1
+                    yield sentence
+                line_offset = offset
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def split_filter_file_into_sentences(
+    file_to_filter: Union[str, Path, List[str]]
+) -> Tuple[List[str], int]:
+    files_to_filter = (
+        file_to_filter if isinstance(file_to_filter, list) else [file_to_filter]
+    )
+    source_counts: List[Tuple[str, "Counter[str]"]] = []
+    sentences = list(read_sentences(files_to_filter, source_counts))
+    return sentences, sum(counts["lines"] for _, counts in source_counts)
+
+
+def count_selected_phrases_by_source(
+    verdicts: Iterable[SentenceVerdict],
+    source_counts: List[Tuple[str, "Counter[str]"]],
+    start: Optional[InputPosition] = None,
+) -> Iterator[SentenceVerdict]:
+    # the verdicts are in the order of the sentences, and a sentence has always been read
+    # (and counted in source_counts) before its verdict arrives
+    source = start.file if start else 0
+    source_verdicts = start.sentences if start else 0
+    for verdict in verdicts:
+        while source_verdicts == source_counts[source][1]["sentences"]:
+            source += 1
+            source_verdicts = 0
+
+        source_verdicts += 1
+        if verdict.selected_phrase is not None:
+            source_counts[source][1]["selected"] += 1
+        yield verdict
+
+
+def describe_sources(source_counts: List[Tuple[str, "Counter[str]"]]) -> List[str]:
+    if len(source_counts) < 2:
+        return []
+
+    return [
+        f"Source {source}: {counts['lines']} lines, {counts['sentences']} phrases, "
+        f"{counts['selected']} selected"
+        for source, counts in source_counts
+    ]
 
 
 def is_line_length_correct(line: str) -> bool:
@@ -203,7 +608,7 @@ def line_ends_with_punctuation(
 
 
 def are_words_repeated(line: str) -> bool:
-    if not re.search(REPEATED_WORDS, line.lower()):
+    if not REPEATED_WORDS.search(line.lower()):
         return False
 
     return True
@@ -213,9 +618,8 @@ def _is_word_too_short_to_be_name(name_search: Match[str]) -> bool:
     return name_search.span()[0] == 0 and len(name_search.group(0).split(" ")[0]) <= 2
 
 
-def is_name(line: str, surnames: List[str]) -> bool:
-    possible_names = re.compile(r"[A-Z][a-ü]+ ([Dd][\'e](l)?)? ?[A-Z][a-ü]*")
-    name_search = re.search(possible_names, line)
+def is_name(line: str, surnames: Collection[str]) -> bool:
+    name_search = POSSIBLE_NAMES.search(line)
 
     if name_search:
         possible_name = name_search.group(0)
@@ -231,7 +635,7 @@ def is_name(line: str, surnames: List[str]) -> bool:
 
 
 def clean_up_characters_in_parentheses(line: str) -> str:
-    line = re.sub(r" \([A-Úa-ú0-9 -\.\,]*\)", "", line)
+    line = CHARACTERS_IN_PARENTHESES.sub("", line)
     return line
 
 
@@ -259,6 +663,25 @@ def are_numbers_in_line(line: str) -> bool:
     return any(char in NUMBERS for char in line)
 
 
+def find_excluded_characters_hours_or_numbers(
+    line: str, numbers: bool
+) -> Optional[str]:
+    # a single scan that gives the same result as checking are_excluded_characters_in_line,
+    # are_time_expressions_in_line and are_numbers_in_line one after the other
+    pattern = CHARACTERS_HOURS_AND_NUMBERS if numbers else CHARACTERS_AND_HOURS
+    found = set()
+    for match in pattern.finditer(line):
+        if match.lastgroup == "excluded_characters":
+            return "excluded_characters"
+        found.add(match.lastgroup)
+
+    if "excluded_hours" in found:
+        return "excluded_hours"
+    if "excluded_nums" in found:
+        return "excluded_nums"
+    return None
+
+
 def is_correct_number_of_tokens(tokens: List[str]) -> bool:
     return len(tokens) > 3 and len(tokens) < 19
 
@@ -274,13 +697,36 @@ def is_token_a_verb(token: Token) -> bool:
     return False
 
 
-def replace_abbreviations(token: Token, line: str) -> str:
-    if token.text.lower() in REPLACEMENT_WORDS.keys():
-        line = line.replace(
-            token.text,
-            REPLACEMENT_WORDS[token.text.lower()],
-        )
+# the replacements of symbols, such as ’, which are replaced everywhere in the line once
+# one of its tokens is the symbol, also inside words like l’home
+REPLACEMENT_SYMBOLS = frozenset(
+    word for word in REPLACEMENT_WORDS if not any(char.isalnum() for char in word)
+)
+
 
+def replace_abbreviations(tokens: Iterable[Token], line: str) -> str:
+    # the line is rebuilt in a single pass, replacing only the characters of the tokens
+    # that are abbreviations, so that a word followed by the final period, like "vol.",
+    # is not taken for an abbreviation
+    parts = []
+    symbols = set()
+    end = 0
+    for token in tokens:
+        replacement = REPLACEMENT_WORDS.get(token.lower_)
+        if replacement is None:
+            continue
+        if token.lower_ in REPLACEMENT_SYMBOLS:
+            symbols.add(token.lower_)
+            continue
+
+        parts += [line[end : token.idx], replacement]
+        end = token.idx + len(token.text)
+    if parts:
+        parts.append(line[end:])
+        line = "".join(parts)
+
+    for symbol in symbols:
+        line = line.replace(symbol, REPLACEMENT_WORDS[symbol])
     return line
 
 
@@ -307,48 +753,33 @@ def _is_token_depicting_an_hour(token: Token) -> bool:
 
 
 def _replace_hour_abbreviation_with_full_word(
-    token: Token, line: str, number: str, number_in_catalan: str
+    token: Token, line: str, number: str, hour_in_catalan: str
 ) -> str:
     line = line.replace(token.text, token.text[:-1])
-    line = re.sub(number, number_in_catalan + " hores", line)
+    line = re.sub(number, hour_in_catalan, line)
     return line
 
 
-def transcribe_number(token: Token, line: str) -> str:
+def transcribe_number(
+    token: Token,
+    line: str,
+    number_transcriber: Callable[[int, bool], str] = transcribe_number_in_catalan,
+) -> str:
     numbers = re.findall(r" \d+ |\d+(?=\D|$)", token.text)
     for number in numbers:
         try:
-            number_as_word = pronounce_number(int(number), "en")
-            number_in_catalan = translate_to_catalan(number_as_word)
             if _is_token_depicting_an_hour(token):
                 line = _replace_hour_abbreviation_with_full_word(
-                    token, line, number, number_in_catalan
+                    token, line, number, number_transcriber(int(number), True)
                 )
             else:
-                line = re.sub(number, number_in_catalan, line)
+                line = re.sub(number, number_transcriber(int(number), False), line)
         except IOError as err:
             raise IOError(err)
 
     return line
 
 
-def translate_to_catalan(number_in_english: str) -> str:
-    command = f'echo "{number_in_english}" | apertium eng-cat'
-    process = subprocess.Popen(
-        command,
-        shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    output, error = process.communicate()
-
-    if error:
-        raise IOError(error)
-    else:
-        return output.strip()
-
-
 def is_token_a_proper_noun(token: Token) -> bool:
     if token.text[0].isupper():
         return True
@@ -399,10 +830,14 @@ def create_output_dir_if_not_exists(output_dir: Path) -> None:
         print("The directory '", output_dir, "' already exists")
 
 
-def create_case_studies_file(output_file: Path, case_studies: List[List[str]]) -> None:
-    with open(output_file, "w") as f:
-        for phrase in case_studies:
-            f.writelines(phrase[1] + "\t" + phrase[0] + "\n")
+def create_case_studies_file(
+    output_file: Path, case_studies: List[List[str]], compression: Optional[str] = None
+) -> None:
+    write_lines(
+        output_file,
+        (phrase[1] + "\t" + phrase[0] for phrase in case_studies),
+        compression,
+    )
 
 
 def add_args(parser: ArgumentParser) -> None:
@@ -411,7 +846,8 @@ def add_args(parser: ArgumentParser) -> None:
         "-f",
         dest="file_to_filter",
         action="store",
-        help="File to filter",
+        nargs="+",
+        help="Files or glob patterns to filter (.gz, .bz2, .xz and .zst files are decompressed, - reads stdin)",
         required=True,
     )
     parser.add_argument(
@@ -421,6 +857,12 @@ def add_args(parser: ArgumentParser) -> None:
         action="store",
         help="List of words to remove",
     )
+    parser.add_argument(
+        "--list-casefold",
+        dest="list_casefold",
+        action="store_true",
+        help="Remove the words of the list whatever their case",
+    )
     parser.add_argument(
         "--dir",
         "-d",
@@ -468,396 +910,1083 @@ def add_args(parser: ArgumentParser) -> None:
         help="Exclude sentences with proper nouns",
         default=False,
     )
+    parser.add_argument(
+        "--number-backend",
+        dest="number_backend",
+        action="store",
+        choices=NUMBER_BACKENDS,
+        help="How numbers are transcribed into Catalan (apertium is kept to verify the native speller)",
+        default="native",
+    )
+    parser.add_argument(
+        "--apertium-workers",
+        dest="apertium_workers",
+        action="store",
+        type=int,
+        help="Number of persistent apertium processes used by the apertium number backend",
+        default=1,
+    )
+    parser.add_argument(
+        "--number-cache",
+        dest="number_cache",
+        action="store",
+        help="File where number transcriptions are cached between runs "
+        f"(default: {NUMBER_CACHE_FILE_NAME} in --dir, or next to the results "
+        "directory without --dir)",
+    )
+    parser.add_argument(
+        "--number-cache-size",
+        dest="number_cache_size",
+        action="store",
+        type=int,
+        help="Number of number transcriptions kept in memory",
+        default=NUMBER_CACHE_SIZE,
+    )
+    parser.add_argument(
+        "--no-number-cache",
+        dest="no_number_cache",
+        action="store_true",
+        help="Do not cache number transcriptions on disk",
+        default=False,
+    )
+    parser.add_argument(
+        "--spelling-cache-size",
+        dest="spelling_cache_size",
+        action="store",
+        type=int,
+        help="Number of Hunspell spell-check results kept in memory",
+        default=SPELLING_CACHE_SIZE,
+    )
+    parser.add_argument(
+        "--spelling-frequency-list",
+        dest="spelling_frequency_list",
+        action="store",
+        help="List of words, most frequent first, that are spell-checked before filtering "
+        "to fill the spelling cache",
+    )
+    parser.add_argument(
+        "--lexicon",
+        dest="lexicon",
+        action="store",
+        help="Lexicon built from the Hunspell dictionary with lexicon.py, where words are "
+        "looked up before asking Hunspell",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        dest="workers",
+        action="store",
+        type=int,
+        help="Number of processes that filter sentences in parallel",
+        default=1,
+    )
+    parser.add_argument(
+        "--split-workers",
+        dest="split_workers",
+        action="store",
+        type=int,
+        help="Number of processes that split the input into sentences in parallel",
+        default=0,
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        action="store",
+        type=int,
+        help="Number of sentences filtered, or sent to a worker, at a time",
+        default=SENTENCE_CHUNK_SIZE,
+    )
+    parser.add_argument(
+        "--spacy-batch-size",
+        dest="spacy_batch_size",
+        action="store",
+        type=int,
+        help="Number of sentences tagged by spaCy at a time, at most --chunk-size",
+        default=SPACY_BATCH_SIZE,
+    )
+    parser.add_argument(
+        "--dedup-index",
+        dest="dedup_index",
+        action="store",
+        help="File with the hashes of the sentences selected in previous runs, "
+        "which is updated with the new ones",
+    )
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="Write every sentence to its results file as it is filtered instead of "
+        "keeping the results in memory",
+        default=False,
+    )
+    parser.add_argument(
+        "--no-sort",
+        dest="no_sort",
+        action="store_true",
+        help="Leave the streamed results files in input order instead of sorting them",
+        default=False,
+    )
+    parser.add_argument(
+        "--sort-run-size",
+        dest="sort_run_size",
+        action="store",
+        type=int,
+        help="Number of lines sorted in memory at a time when sorting the streamed results files",
+        default=SORT_RUN_SIZE,
+    )
+    parser.add_argument(
+        "--compress-output",
+        dest="output_compression",
+        action="store",
+        choices=list(OUTPUT_COMPRESSIONS),
+        help="Compress the results files with gzip (gz) or zstd (zst)",
+    )
+    parser.add_argument(
+        "--write-threads",
+        dest="write_threads",
+        action="store",
+        type=int,
+        help="Number of results files written, sorted and compressed at the same time",
+        default=1,
+    )
+    parser.add_argument(
+        "--verdict-store",
+        dest="verdict_store",
+        action="store",
+        help="File where the verdicts of the filtered sentences are stored, so that the "
+        "sentences filtered with the same configuration in previous runs are not filtered again",
+    )
+    parser.add_argument(
+        "--records",
+        dest="records",
+        action="store",
+        choices=RECORD_FORMATS,
+        help="Also write a record of every sentence, with its verdict and where it was "
+        "read from, in this format",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        help="Time every stage of the filter and its functions, and count the sentences "
+        "rejected at every stage",
+        default=False,
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        dest="checkpoint_every",
+        action="store",
+        type=int,
+        help="Number of sentences filtered between checkpoints of the run in the output "
+        "directory, from which it can be resumed (implies --stream)",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Resume an interrupted run from its last checkpoint in the output directory "
+        "given with --dir",
+        default=False,
+    )
 
 
-def main() -> None:
-    parser = ArgumentParser()
-    add_args(parser)
-    args = parser.parse_args()
+def get_spacy_pipeline_mode(verb: bool) -> str:
+    # part-of-speech tags are only needed to look for verbs
+    return "tagger" if verb else "tokenizer"
 
-    lingua_franca.load_language("en")
-    dic = hunspell.HunSpell("data/ca.dic", "data/ca.aff")
-    spacy_tokenizer = spacy.load(
-        "ca_core_news_sm", exclude=["parser", "attribute_ruler", "lemmatizer", "ner"]
-    )
-    surnames = get_surname_list()
 
-    file_to_filter = Path(args.file_to_filter)
-    filter_file_name = file_to_filter.stem
+def load_spacy_tokenizer(verb: bool) -> Language:
+    if get_spacy_pipeline_mode(verb) == "tagger":
+        return spacy.load(SPACY_MODEL, exclude=TAGGER_EXCLUDED_COMPONENTS)
 
-    selected_options = store_and_print_selected_options(args, filter_file_name)
-    output_dir = create_output_directory_path(args.dir, file_to_filter)
-    words_to_exclude = create_excluded_words_list(args.list)
-    sentences, total_lines = split_filter_file_into_sentences(file_to_filter)
-
-    # here are the lists where the sentences are saved depending on whether they are discarded or not
-    discarded_tokens: List[str] = []
-    selected_phrases: List[str] = []
-    selected_phrases_orig: List[str] = []
-    selected_phrases_repeated: List[str] = []
-    excluded_characters: List[str] = []
-    excluded_spellings: List[str] = []
-    excluded_ratios: List[str] = []
-    excluded_sentences_improper_length: List[str] = []
-    excluded_acronyms: List[str] = []
-    excluded_words: List[str] = []
-    excluded_repeated_words: List[str] = []
-    excluded_names: List[str] = []
-    error_num: List[str] = []
-    excluded_abbreviations: List[str] = []
-    excluded_hours: List[str] = []
-    possible_breaks: List[str] = []
-    case_studies: List[List[str]] = []
-    spelling_case_studies: List[List[str]] = []
-    excluded_lowercase: List[str] = []
-    excluded_nums: List[str] = []
-    excluded_verbs: List[str] = []
-
-    for line in sentences:
-        proper_noun_count = 0
-        exclude_phrase = False
-        original_phrase = line
-
-        if not is_line_length_correct(line):
-            (
-                excluded_sentences_improper_length,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_sentences_improper_length, exclude_phrase
-            )
-            continue
+    return spacy.load(SPACY_MODEL, exclude=TOKENIZER_EXCLUDED_COMPONENTS)
 
-        line = remove_unnecessary_characters(line)
 
-        if args.capitals and line_starts_with_lowercase_letter(line):
-            (
-                excluded_lowercase,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_lowercase, exclude_phrase
+def load_filter_resources(
+    args: Namespace, number_cache_path: Union[Path, None]
+) -> FilterResources:
+    hunspell_dic = hunspell.HunSpell(str(DATA_DIR / "ca.dic"), str(DATA_DIR / "ca.aff"))
+    if args.lexicon:
+        hunspell_dic = LexiconSpellChecker(Lexicon(Path(args.lexicon)), hunspell_dic)
+    dic = CachedSpellChecker(hunspell_dic, args.spelling_cache_size)
+    if args.spelling_frequency_list:
+        dic.warm_up(
+            read_word_frequency_list(
+                Path(args.spelling_frequency_list), args.spelling_cache_size
             )
+        )
+    spacy_tokenizer = load_spacy_tokenizer(args.verb)
+    number_transcriber = NumberTranscriber(
+        args.number_backend,
+        args.apertium_workers,
+        cache_size=args.number_cache_size,
+        cache_path=number_cache_path,
+    )
+    if args.profile:
+        start_function_profiling()
+    return FilterResources(
+        dic,
+        spacy_tokenizer,
+        get_surname_list(),
+        create_excluded_words_list(args.list, args.list_casefold),
+        number_transcriber,
+        Profile() if args.profile else None,
+        create_excluded_phrase_automaton(args.list, args.list_casefold),
+    )
 
-        if args.punctuation and not line_ends_with_punctuation(line):
-            (
-                possible_breaks,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, possible_breaks, exclude_phrase
-            )
 
-        if are_words_repeated(line):
-            (
-                excluded_repeated_words,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_repeated_words, exclude_phrase
-            )
-            continue
+def prefilter_sentence(
+    line: str, args: Namespace, resources: FilterResources
+) -> Union[SentenceVerdict, PrefilteredSentence]:
+    exclusions: List[str] = []
+    original_phrase = line
 
-        if args.proper_nouns and is_name(line, surnames):
-            (
-                excluded_names,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_names, exclude_phrase
-            )
+    if not is_line_length_correct(line):
+        return SentenceVerdict(original_phrase, ["excluded_sentences_improper_length"])
 
-        line = clean_up_characters_in_parentheses(line)
-        if are_excluded_characters_in_line(line):
-            (
-                excluded_characters,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_characters, exclude_phrase
-            )
-            continue
+    line = remove_unnecessary_characters(line)
 
-        if are_time_expressions_in_line(line):
-            (
-                excluded_hours,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_hours, exclude_phrase
-            )
-            continue
+    if args.capitals and line_starts_with_lowercase_letter(line):
+        exclusions.append("excluded_lowercase")
 
-        if args.numbers and are_numbers_in_line(line):
-            (
-                excluded_nums,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_nums, exclude_phrase
-            )
-            continue
+    if args.punctuation and not line_ends_with_punctuation(line):
+        exclusions.append("possible_breaks")
 
-        simple_tokens = line.split(" ")  # we do a simple first tokenization
-        if not is_correct_number_of_tokens(simple_tokens):
-            (
-                excluded_sentences_improper_length,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_sentences_improper_length, exclude_phrase
-            )
-            continue
+    if are_words_repeated(line):
+        exclusions.append("excluded_repeated_words")
+        return SentenceVerdict(original_phrase, exclusions)
 
-        if sentence_ends_incorrectly(simple_tokens):
-            (
-                possible_breaks,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, possible_breaks, exclude_phrase
+    if args.proper_nouns and is_name(line, resources.surnames):
+        exclusions.append("excluded_names")
+
+    line = clean_up_characters_in_parentheses(line)
+    exclusion = find_excluded_characters_hours_or_numbers(line, args.numbers)
+    if exclusion is not None:
+        exclusions.append(exclusion)
+        return SentenceVerdict(original_phrase, exclusions)
+
+    simple_tokens = line.split(" ")  # we do a simple first tokenization
+    if not is_correct_number_of_tokens(simple_tokens):
+        exclusions.append("excluded_sentences_improper_length")
+        return SentenceVerdict(original_phrase, exclusions)
+
+    if sentence_ends_incorrectly(simple_tokens):
+        exclusions.append("possible_breaks")
+        return SentenceVerdict(original_phrase, exclusions)
+
+    if resources.excluded_phrases is not None:
+        phrase = resources.excluded_phrases.find(line)
+        if phrase is not None:
+            exclusions.append("excluded_words")
+            return SentenceVerdict(
+                original_phrase, exclusions, None, ("case_studies", phrase)
             )
-            continue
 
-        tokens = spacy_tokenizer(line)
-        verb_token_present = False
-        for token in tokens:
-            if is_token_a_verb(token):
-                verb_token_present = True
-
-            line = replace_abbreviations(token, line)
-
-            if token.text.isalpha():
-                if len(token) == 1 and not is_valid_single_letter_token(token):
-                    (
-                        excluded_spellings,
-                        exclude_phrase,
-                    ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                        original_phrase, excluded_spellings, exclude_phrase
-                    )
-                    spelling_case_studies.append(
-                        [
-                            original_phrase,
-                            token.text,
-                        ]
-                    )
+    return PrefilteredSentence(original_phrase, line, exclusions)
+
+
+def check_tokens(
+    sentence: PrefilteredSentence,
+    tokens: Doc,
+    args: Namespace,
+    resources: FilterResources,
+) -> SentenceVerdict:
+    proper_noun_count = 0
+    original_phrase, line, exclusions = sentence
+    exclusions = list(exclusions)
+    case_study = None
+
+    verb_token_present = False
+    line = replace_abbreviations(tokens, line)
+    for token in tokens:
+        if is_token_a_verb(token):
+            verb_token_present = True
+
+        if token.text.isalpha():
+            if len(token) == 1 and not is_valid_single_letter_token(token):
+                exclusions.append("excluded_spellings")
+                case_study = ("spelling_case_studies", token.text)
+                break
+
+            if token.text.isupper():
+                exclusions.append("excluded_acronyms")
+                break
+
+            word = token.text.casefold() if args.list_casefold else token.text
+            if word in resources.words_to_exclude:
+                exclusions.append("excluded_words")
+                case_study = ("case_studies", token.text)
+                break
+
+            if not resources.dic.spell(token.text):
+                if token_starts_with_lowercase_letter_and_is_not_a_pronoun(token):
+                    exclusions.append("excluded_spellings")
+                    case_study = ("spelling_case_studies", token.text)
                     break
 
-                if token.text.isupper():
-                    (
-                        excluded_acronyms,
-                        exclude_phrase,
-                    ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                        original_phrase, excluded_acronyms, exclude_phrase
-                    )
-                    break
+                if is_token_a_proper_noun(token):
+                    proper_noun_count += 1
+
+        if token_contains_numbers(token):
+            try:
+                line = transcribe_number(token, line, resources.number_transcriber)
+            except IOError as err:
+                logging.error(err)
+                exclusions.append("error_num")
+                break
+            if not exclusions and not is_correct_number_of_tokens(line.split(" ")):
+                exclusions.append("excluded_sentences_improper_length")
+
+    if not is_proper_noun_ratio_correct(proper_noun_count, tokens):
+        exclusions.append("excluded_ratios")
+    elif args.verb and not verb_token_present:
+        exclusions.append("excluded_verbs")
+
+    if exclusions:
+        return SentenceVerdict(original_phrase, exclusions, None, case_study)
+
+    if is_multiple_periods_in_sentence(line):
+        if ".." in line:
+            line = correctly_format_elipses(line)
+        else:
+            exclusions.append("excluded_abbreviations")
+        return SentenceVerdict(original_phrase, exclusions)
+
+    line = fix_apostrophes(line)
+    line = fix_quotation_marks(line)
+    if not line_ends_with_punctuation(line):
+        line = clean_up_sentence_end(line)
+    line = replace_multiple_punctuation_marks_with_single_punctuation_mark(line)
+    line = clean_up_sentence_beginning(line)
+    return SentenceVerdict(original_phrase, exclusions, line)
+
+
+def filter_sentence(
+    line: str, args: Namespace, resources: FilterResources
+) -> SentenceVerdict:
+    sentence = prefilter_sentence(line, args, resources)
+    if isinstance(sentence, SentenceVerdict):
+        return sentence
+
+    return check_tokens(
+        sentence, resources.spacy_tokenizer(sentence.line), args, resources
+    )
 
-                if token.text in words_to_exclude:
-                    (
-                        excluded_words,
-                        exclude_phrase,
-                    ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                        original_phrase, excluded_words, exclude_phrase
-                    )
-                    case_studies.append(
-                        [
-                            original_phrase,
-                            token.text,
-                        ]
-                    )
-                    break
 
-                if not dic.spell(token.text):
-                    if token_starts_with_lowercase_letter_and_is_not_a_pronoun(token):
-                        (
-                            excluded_spellings,
-                            exclude_phrase,
-                        ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                            original_phrase, excluded_spellings, exclude_phrase
-                        )
-                        spelling_case_studies.append(
-                            [
-                                original_phrase,
-                                token.text,
-                            ]
-                        )
-                        (
-                            discarded_tokens,
-                            exclude_phrase,
-                        ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                            token.text, discarded_tokens, exclude_phrase
-                        )
-                        break
-
-                    if is_token_a_proper_noun(token):
-                        proper_noun_count += 1
-
-            if token_contains_numbers(token):
-                try:
-                    line = transcribe_number(token, line)
-                except IOError as err:
-                    logging.error(err)
-                    (
-                        error_num,
-                        exclude_phrase,
-                    ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                        original_phrase, error_num, exclude_phrase
-                    )
-                    break
-                if not exclude_phrase and not is_correct_number_of_tokens(
-                    line.split(" ")
-                ):
-                    (
-                        excluded_sentences_improper_length,
-                        exclude_phrase,
-                    ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                        original_phrase,
-                        excluded_sentences_improper_length,
-                        exclude_phrase,
-                    )
+def split_into_chunks(sentences: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    chunk: List[T] = []
+    for sentence in sentences:
+        chunk.append(sentence)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def filter_chunk(
+    chunk: List[str], args: Namespace, resources: FilterResources
+) -> List[SentenceVerdict]:
+    profile = resources.profile
+    with profile_stage(profile, "number prefetch"):
+        resources.number_transcriber.prefetch(find_numbers(chunk))
+
+    # the cheap checks run first, and only the sentences that pass them are tagged,
+    # in batches
+    with profile_stage(profile, "prefilter", len(chunk)):
+        prefiltered = [prefilter_sentence(line, args, resources) for line in chunk]
+    survivors = [
+        sentence
+        for sentence in prefiltered
+        if isinstance(sentence, PrefilteredSentence)
+    ]
+    docs: Iterator[Doc] = resources.spacy_tokenizer.pipe(
+        (sentence.line for sentence in survivors),
+        batch_size=args.spacy_batch_size,
+    )
+    if profile is not None:
+        docs = profile.time_iterator("spaCy", docs)
+
+    verdicts = []
+    with profile_stage(profile, "token checks", len(survivors), excluding="spaCy"):
+        for sentence in prefiltered:
+            if isinstance(sentence, PrefilteredSentence):
+                sentence = check_tokens(sentence, next(docs), args, resources)
+            verdicts.append(sentence)
+
+    resources.number_transcriber.commit()
+    if profile is not None:
+        add_rejections_to_profile(profile, prefiltered, verdicts)
+    return verdicts
+
+
+def add_rejections_to_profile(
+    profile: Profile,
+    prefiltered: List[Union[SentenceVerdict, PrefilteredSentence]],
+    verdicts: List[SentenceVerdict],
+) -> None:
+    # a sentence is rejected by the stage that gives its verdict, for its first exclusion
+    for sentence, verdict in zip(prefiltered, verdicts):
+        if not verdict.exclusions:
+            continue
+
+        stage = "prefilter" if isinstance(sentence, SentenceVerdict) else "token checks"
+        profile.add_rejection(stage, verdict.exclusions[0])
 
-        if not is_proper_noun_ratio_correct(proper_noun_count, tokens):
-            (
-                excluded_ratios,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_ratios, exclude_phrase
-            )
-        elif args.verb and not verb_token_present:
-            (
-                excluded_verbs,
-                exclude_phrase,
-            ) = add_line_to_exclusion_list_and_set_exclude_phrase_bool_to_true(
-                original_phrase, excluded_verbs, exclude_phrase
-            )
 
-        if not exclude_phrase:
-            if is_multiple_periods_in_sentence(line):
-                if ".." in line:
-                    line = correctly_format_elipses(line)
-                else:
-                    excluded_abbreviations.append(original_phrase)
+def filter_sentences(
+    sentences: Iterable[str], args: Namespace, resources: FilterResources
+) -> Iterator[SentenceVerdict]:
+    for chunk in split_into_chunks(sentences, args.chunk_size):
+        yield from filter_chunk(chunk, args, resources)
+
+
+def get_resource_counters(resources: FilterResources) -> "Counter[str]":
+    counters = resources.number_transcriber.counters()
+    counters.update(resources.dic.counters())
+    if isinstance(resources.dic.dic, LexiconSpellChecker):
+        counters.update(resources.dic.dic.counters())
+
+    return counters
+
+
+def create_filter_fingerprint(args: Namespace) -> str:
+    # a verdict depends on the options, the excluded words, the dictionary, the surnames,
+    # spaCy and its model, and the code of the filter itself
+    settings = [f"{option}={getattr(args, option)}" for option in FINGERPRINT_OPTIONS]
+    settings += [
+        f"spacy={spacy.util.get_package_version('spacy')}",
+        f"{SPACY_MODEL}={spacy.util.get_package_version(SPACY_MODEL)}",
+    ]
+    # every module of the package is included, since the verdicts also depend on the
+    # modules filter_phrases.py imports, such as the phrase automaton and the spelling
+    files = [
+        DATA_DIR / "ca.dic",
+        DATA_DIR / "ca.aff",
+        DATA_DIR / "cognoms_list.txt",
+        *sorted(Path(__file__).resolve().parent.glob("*.py")),
+    ]
+    if args.list:
+        files.append(Path(args.list))
+
+    return create_fingerprint(settings, files)
+
+
+def _verdict_from_store(values: List[Any]) -> SentenceVerdict:
+    original_phrase, exclusions, selected_phrase, case_study = values
+    return SentenceVerdict(
+        original_phrase,
+        exclusions,
+        selected_phrase,
+        tuple(case_study) if case_study is not None else None,
+    )
+
+
+def reuse_stored_verdicts(
+    sentences: Iterable[str],
+    verdict_store: Optional[VerdictStore],
+    filter_verdicts: Callable[[Iterable[str]], Iterator[SentenceVerdict]],
+) -> Iterator[SentenceVerdict]:
+    if verdict_store is None:
+        yield from filter_verdicts(sentences)
+        return
+
+    # only the sentences without a stored verdict are filtered, and every verdict waits in
+    # pending (None for those being filtered) until the ones before it are yielded
+    pending: "deque[Optional[SentenceVerdict]]" = deque()
+
+    def sentences_to_filter() -> Iterator[str]:
+        for sentence in sentences:
+            stored_verdict = verdict_store.get(sentence)
+            if stored_verdict is None:
+                pending.append(None)
+                yield sentence
             else:
-                line = fix_apostrophes(line)
-                line = fix_quotation_marks(line)
-                if not line_ends_with_punctuation(line):
-                    line = clean_up_sentence_end(line)
-                line = replace_multiple_punctuation_marks_with_single_punctuation_mark(
-                    line
-                )
-                line = clean_up_sentence_beginning(line)
-                if line not in selected_phrases:
-                    selected_phrases.append(line)
-                    selected_phrases_orig.append(original_phrase)
-                else:
-                    selected_phrases_repeated.append(line)
+                pending.append(_verdict_from_store(stored_verdict))
+
+    for verdict in filter_verdicts(sentences_to_filter()):
+        stored_verdict = pending.popleft()
+        while stored_verdict is not None:
+            yield stored_verdict
+            stored_verdict = pending.popleft()
+        # a failed number transcription may not fail again, so it is filtered again
+        # next time, like the number caches do
+        if "error_num" not in verdict.exclusions:
+            verdict_store.put(verdict.original_phrase, verdict)
+        yield verdict
+
+    for remaining_verdict in pending:
+        assert remaining_verdict is not None
+        yield remaining_verdict
+
+
+def create_sentence_record(
+    verdict: SentenceVerdict, source: SentenceSource, accepted: bool
+) -> SentenceRecord:
+    # a selected sentence that is not accepted is repeated
+    reason = verdict.exclusions[0] if verdict.exclusions else None
+    if verdict.selected_phrase is not None and not accepted:
+        reason = "selected_phrases_repeated"
+
+    return SentenceRecord(
+        source.file,
+        source.line,
+        source.offset,
+        verdict.original_phrase,
+        verdict.selected_phrase,
+        accepted,
+        reason,
+        verdict.exclusions,
+        verdict.case_study[1] if verdict.case_study is not None else None,
+    )
 
-    create_output_dir_if_not_exists(output_dir)
 
-    total = len(sentences)
-    statistics = [
+def create_filter_result(verdict: SentenceVerdict) -> FilterResult:
+    return FilterResult(
+        verdict.selected_phrase is not None,
+        verdict.exclusions[0] if verdict.exclusions else None,
+        verdict.selected_phrase,
+    )
+
+
+def parse_filter_options(argv: List[str]) -> Namespace:
+    # the filter options of the command line, without any file to filter
+    parser = ArgumentParser()
+    add_args(parser)
+    return parser.parse_args(["--file", STDIN] + argv)
+
+
+def create_filter_options(**options: Any) -> Namespace:
+    # the defaults of the command line options, replacing the given ones
+    args = parse_filter_options([])
+    for name, value in options.items():
+        if not hasattr(args, name):
+            raise ValueError(f"Unknown filter option: {name}")
+        setattr(args, name, value)
+
+    return args
+
+
+class PhraseFilter:
+    def __init__(
+        self,
+        args: Optional[Namespace] = None,
+        number_cache_path: Union[Path, None] = None,
+        **options: Any,
+    ) -> None:
+        self.args = args if args is not None else create_filter_options(**options)
+        lingua_franca.load_language("en")
+        self.resources = load_filter_resources(self.args, number_cache_path)
+
+    def __enter__(self) -> "PhraseFilter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def filter(self, sentence: str) -> FilterResult:
+        return create_filter_result(
+            filter_sentence(sentence, self.args, self.resources)
+        )
+
+    def filter_many(self, sentences: Iterable[str]) -> Iterator[FilterResult]:
+        for verdict in self.verdicts(sentences):
+            yield create_filter_result(verdict)
+
+    def verdicts(self, sentences: Iterable[str]) -> Iterator[SentenceVerdict]:
+        return filter_sentences(sentences, self.args, self.resources)
+
+    def counters(self) -> "Counter[str]":
+        return get_resource_counters(self.resources)
+
+    def close(self) -> None:
+        self.resources.number_transcriber.close()
+
+
+# the phrase filter of a worker process, loaded once by _initialize_worker
+_worker_filter: Optional[PhraseFilter] = None
+
+
+def _initialize_worker(args: Namespace, number_cache_path: Union[Path, None]) -> None:
+    global _worker_filter
+
+    _worker_filter = PhraseFilter(args, number_cache_path)
+
+
+# the verdicts of a chunk, and the pid, counters and profile of the worker that filtered it
+WorkerResult = Tuple[List[SentenceVerdict], int, "Counter[str]", Optional[Profile]]
+
+
+def _filter_chunk_in_worker(chunk: List[str]) -> WorkerResult:
+    assert _worker_filter is not None
+    resources = _worker_filter.resources
+    verdicts = filter_chunk(chunk, _worker_filter.args, resources)
+    if resources.profile is not None:
+        collect_function_profile(resources.profile)
+    return verdicts, os.getpid(), _worker_filter.counters(), resources.profile
+
+
+def filter_sentences_in_workers(
+    sentences: Iterable[str],
+    args: Namespace,
+    number_cache_path: Union[Path, None],
+    resource_counters: "Counter[str]",
+    profile: Optional[Profile] = None,
+) -> Iterator[SentenceVerdict]:
+    # counters and profiles are cumulative per worker, so only the latest ones of each
+    # worker are kept
+    worker_counters: Dict[int, "Counter[str]"] = {}
+    worker_profiles: Dict[int, Profile] = {}
+    with multiprocessing.Pool(
+        args.workers,
+        initializer=_initialize_worker,
+        initargs=(args, number_cache_path),
+    ) as pool:
+        # Pool.imap would read the whole input ahead, so only a few chunks per worker
+        # are in flight at a time and the sentences are read as the workers need them
+        pending: "deque[AsyncResult[WorkerResult]]" = deque()
+        for chunk in split_into_chunks(sentences, args.chunk_size):
+            pending.append(pool.apply_async(_filter_chunk_in_worker, (chunk,)))
+            if len(pending) < args.workers * 2:
+                continue
+
+            verdicts, worker, counters, worker_profile = pending.popleft().get()
+            worker_counters[worker] = counters
+            if worker_profile is not None:
+                worker_profiles[worker] = worker_profile
+            yield from verdicts
+
+        while pending:
+            verdicts, worker, counters, worker_profile = pending.popleft().get()
+            worker_counters[worker] = counters
+            if worker_profile is not None:
+                worker_profiles[worker] = worker_profile
+            yield from verdicts
+
+    for counters in worker_counters.values():
+        resource_counters.update(counters)
+    if profile is not None:
+        for worker_profile in worker_profiles.values():
+            profile.update(worker_profile)
+
+
+def create_category_files(
+    output_dir: Path, filter_file_name: str, checkpoint: Optional[Checkpoint] = None
+) -> Tuple[Dict[str, CategoryFile], Dict[str, CaseStudyFile]]:
+    # when resuming, the files keep what had been written when the checkpoint was made
+    results = {
+        category: CategoryFile(
+            output_dir / f"{filter_file_name}_{file}",
+            *(checkpoint.results[category] if checkpoint else ()),
+        )
+        for category, file in OUTPUT_FILES.items()
+    }
+    case_studies = {
+        name: CaseStudyFile(
+            output_dir / f"{filter_file_name}_{file}",
+            *(checkpoint.case_studies[name] if checkpoint else ()),
+        )
+        for name, file in CASE_STUDY_FILES.items()
+    }
+    return results, case_studies
+
+
+def add_verdict_to_results(
+    verdict: SentenceVerdict,
+    results: Mapping[str, Union[List[str], CategoryFile]],
+    case_studies: Mapping[str, Union[List[List[str]], CaseStudyFile]],
+    selected_index: DeduplicationIndex,
+) -> bool:
+    # whether the sentence is selected and not repeated
+    for exclusion in verdict.exclusions:
+        results[exclusion].append(verdict.original_phrase)
+
+    if verdict.case_study is not None:
+        case_study, token = verdict.case_study
+        case_studies[case_study].append([verdict.original_phrase, token])
+
+    if verdict.selected_phrase is None:
+        return False
+
+    if not selected_index.add(verdict.selected_phrase):
+        results["selected_phrases_repeated"].append(verdict.selected_phrase)
+        return False
+
+    results["selected_phrases"].append(verdict.selected_phrase)
+    results["selected_phrases_orig"].append(verdict.original_phrase)
+    return True
+
+
+def add_verdicts_to_results(
+    verdicts: Iterable[SentenceVerdict],
+    results: Mapping[str, Union[List[str], CategoryFile]],
+    case_studies: Mapping[str, Union[List[List[str]], CaseStudyFile]],
+    selected_index: DeduplicationIndex,
+    record_file: Optional[RecordFile] = None,
+    sources: "Optional[deque[SentenceSource]]" = None,
+    checkpointer: Optional[Checkpointer] = None,
+) -> None:
+    # the sources are in the order of the verdicts, one per sentence
+    for verdict in verdicts:
+        accepted = add_verdict_to_results(
+            verdict, results, case_studies, selected_index
+        )
+        if record_file is not None and sources is not None:
+            record_file.append(
+                create_sentence_record(verdict, sources.popleft(), accepted)
+            )
+        if checkpointer is not None:
+            checkpointer.add()
+
+
+def describe_results(
+    results: Mapping[str, Sized], total: int, total_lines: int
+) -> List[str]:
+    return [
         "Number of initial lines: " + str(total_lines),
         "Number of initial phrases: " + str(total),
         describe(
             "Sentences excluded due to improper length:",
-            excluded_sentences_improper_length,
+            results["excluded_sentences_improper_length"],
             total,
         ),
         describe(
-            "Sentences excluded due to excluded characters:", excluded_characters, total
+            "Sentences excluded due to excluded characters:",
+            results["excluded_characters"],
+            total,
+        ),
+        describe(
+            "Sentences excluded due to acronyms:", results["excluded_acronyms"], total
+        ),
+        describe(
+            "Sentences excluded due to excluded words:",
+            results["excluded_words"],
+            total,
         ),
-        describe("Sentences excluded due to acronyms:", excluded_acronyms, total),
-        describe("Sentences excluded due to excluded words:", excluded_words, total),
         describe(
-            "Sentences excluded due to excluded spellings:", excluded_spellings, total
+            "Sentences excluded due to excluded spellings:",
+            results["excluded_spellings"],
+            total,
         ),
         describe(
             "Sentences excluded due to incorrect ratio of proper nouns:",
-            excluded_ratios,
+            results["excluded_ratios"],
             total,
         ),
         describe(
-            "Sentences excluded because they contain hours:", excluded_hours, total
+            "Sentences excluded because they contain hours:",
+            results["excluded_hours"],
+            total,
         ),
         describe(
             "Sentences excluded due to repeated excluded words:",
-            excluded_repeated_words,
+            results["excluded_repeated_words"],
             total,
         ),
-        describe("Sentences excluded due to proper nouns:", excluded_names, total),
-        describe("Repeated selected phrases:", selected_phrases_repeated, total),
-        describe("Selected phrases:", selected_phrases, total),
+        describe(
+            "Sentences excluded due to proper nouns:", results["excluded_names"], total
+        ),
+        describe(
+            "Repeated selected phrases:", results["selected_phrases_repeated"], total
+        ),
+        describe("Selected phrases:", results["selected_phrases"], total),
         describe(
             "Sentences excluded because they contain abbreviations:",
-            excluded_abbreviations,
+            results["excluded_abbreviations"],
             total,
         ),
         describe(
             "Sentences excluded because they contain possible breaks:",
-            possible_breaks,
+            results["possible_breaks"],
             total,
         ),
         describe(
             "Sentences excluded because they start with a lowercase letter:",
-            excluded_lowercase,
+            results["excluded_lowercase"],
             total,
         ),
         describe(
-            "Sentences excluded because they contain numbers:", excluded_nums, total
+            "Sentences excluded because they contain numbers:",
+            results["excluded_nums"],
+            total,
         ),
         describe(
             "Sentences excluded because they don't contain verbs:",
-            excluded_verbs,
+            results["excluded_verbs"],
             total,
         ),
-        describe("Errors from transcribing numbers:", error_num, total),
+        describe("Errors from transcribing numbers:", results["error_num"], total),
     ]
+
+
+def write_results(
+    output_dir: Path,
+    filter_file_name: str,
+    args: Namespace,
+    results: Mapping[str, Union[List[str], CategoryFile]],
+    case_studies: Mapping[str, Union[List[List[str]], CaseStudyFile]],
+) -> None:
+    # every file is written, sorted or compressed by a task, and --write-threads tasks
+    # run at the same time
+    compression = args.output_compression
+    tasks: List[Callable[[], None]] = []
+    for category, file in OUTPUT_FILES.items():
+        category_results = results[category]
+        if isinstance(category_results, CategoryFile):
+            category_results.close()
+            if not args.no_sort:
+                tasks.append(
+                    partial(
+                        sort_file,
+                        category_results.path,
+                        args.sort_run_size,
+                        compression,
+                    )
+                )
+            elif compression is not None:
+                tasks.append(partial(compress_file, category_results.path, compression))
+        else:
+            tasks.append(
+                partial(
+                    create_file,
+                    output_dir,
+                    filter_file_name,
+                    file,
+                    category_results,
+                    compression,
+                )
+            )
+
+    for name, file in CASE_STUDY_FILES.items():
+        case_study_results = case_studies[name]
+        if isinstance(case_study_results, CaseStudyFile):
+            case_study_results.close()
+            if compression is not None:
+                tasks.append(
+                    partial(compress_file, case_study_results.path, compression)
+                )
+        else:
+            tasks.append(
+                partial(
+                    create_case_studies_file,
+                    output_dir / f"{filter_file_name}_{file}",
+                    case_study_results,
+                    compression,
+                )
+            )
+
+    run_in_threads(tasks, args.write_threads)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    add_args(parser)
+    args = parser.parse_args()
+
+    if args.resume and not args.dir:
+        parser.error("--resume needs the --dir of the interrupted run")
+
+    lingua_franca.load_language("en")
+
+    try:
+        files_to_filter = expand_input_paths(args.file_to_filter)
+    except IOError as err:
+        parser.error(str(err))
+    filter_file_name = get_filter_file_name(files_to_filter)
+    if (args.checkpoint_every or args.resume) and STDIN in files_to_filter:
+        parser.error("runs that read stdin cannot be checkpointed")
+    if (args.checkpoint_every or args.resume) and args.records:
+        parser.error("runs with --records cannot be checkpointed")
+
+    output_dir = create_output_directory_path(
+        args.dir, Path(files_to_filter[0]), filter_file_name
+    )
+    # the options a verdict depends on, which a resumed run cannot change
+    fingerprint = (
+        create_filter_fingerprint(args)
+        if args.checkpoint_every or args.resume or args.verdict_store
+        else ""
+    )
+    # the checkpoint is checked before anything is written to the output directory
+    checkpoint = None
+    if args.resume:
+        if not (output_dir / CHECKPOINT_FILE_NAME).exists():
+            parser.error(f"{output_dir} has no checkpoint to resume")
+        try:
+            checkpoint = read_checkpoint(output_dir)
+        except (ValueError, KeyError, TypeError) as err:
+            parser.error(f"the checkpoint in {output_dir} cannot be read: {err!r}")
+    if checkpoint is not None and checkpoint.files != files_to_filter:
+        parser.error(f"the checkpoint in {output_dir} is of a run of other files")
+    if checkpoint is not None and checkpoint.fingerprint != fingerprint:
+        parser.error(
+            f"the checkpoint in {output_dir} is of a run with other filter options"
+        )
+
+    selected_options = store_and_print_selected_options(args, filter_file_name)
+    number_cache_path = create_number_cache_path(
+        args.number_cache, args.no_number_cache, output_dir, not args.dir
+    )
+    checkpoint_every: int = args.checkpoint_every or (
+        checkpoint.every if checkpoint else 0
+    )
+    if checkpoint_every:
+        args.stream = True
+
+    source_counts = checkpoint.source_counts if checkpoint else []
+    positions: "Optional[deque[InputPosition]]" = deque() if checkpoint_every else None
+    start = checkpoint.position if checkpoint else None
+    sources: "Optional[deque[SentenceSource]]" = deque() if args.records else None
+    sentences = read_sentences(
+        files_to_filter, source_counts, start, positions, args.split_workers, sources
+    )
+
+    create_output_dir_if_not_exists(output_dir)
+    results: Mapping[str, Union[List[str], CategoryFile]]
+    case_studies: Mapping[str, Union[List[List[str]], CaseStudyFile]]
+    if args.stream:
+        # every sentence is written to its category file as soon as it is filtered,
+        # so memory does not grow with the size of the input
+        results, case_studies = create_category_files(
+            output_dir, filter_file_name, checkpoint
+        )
+    else:
+        results = {category: [] for category in OUTPUT_FILES}
+        case_studies = {name: [] for name in CASE_STUDY_FILES}
+    resource_counters: "Counter[str]" = Counter()
+    selected_index = DeduplicationIndex(
+        Path(args.dedup_index) if args.dedup_index else None
+    )
+    if checkpoint is not None:
+        selected_index.resume(
+            output_dir / DEDUP_CHECKPOINT_FILE_NAME,
+            checkpoint.dedup_size,
+            checkpoint.previous_runs_hits,
+        )
+    checkpointer = None
+    if positions is not None:
+        checkpointer = Checkpointer(
+            output_dir,
+            checkpoint_every,
+            files_to_filter,
+            fingerprint,
+            positions,
+            source_counts,
+            cast(Dict[str, CategoryFile], results),
+            cast(Dict[str, CaseStudyFile], case_studies),
+            selected_index,
+            checkpoint.filtered if checkpoint else 0,
+        )
+
+    record_file = (
+        open_record_file(
+            output_dir / f"{filter_file_name}_records.{args.records}", args.records
+        )
+        if args.records
+        else None
+    )
+
+    verdict_store = (
+        VerdictStore(Path(args.verdict_store), fingerprint)
+        if args.verdict_store
+        else None
+    )
+    profile = Profile() if args.profile else None
+    if profile is not None:
+        start_function_profiling()
+        sentences = profile.time_iterator("read and split", sentences)
+
+    # the time spent waiting for verdicts includes reading and filtering the sentences,
+    # unless they are filtered by workers
+    if args.workers > 1:
+        verdicts = reuse_stored_verdicts(
+            sentences,
+            verdict_store,
+            partial(
+                filter_sentences_in_workers,
+                args=args,
+                number_cache_path=number_cache_path,
+                resource_counters=resource_counters,
+                profile=profile,
+            ),
+        )
+        if profile is not None:
+            verdicts = profile.time_iterator("verdicts", verdicts)
+        with profile_stage(profile, "results", excluding="verdicts"):
+            add_verdicts_to_results(
+                count_selected_phrases_by_source(verdicts, source_counts, start),
+                results,
+                case_studies,
+                selected_index,
+                record_file,
+                sources,
+                checkpointer,
+            )
+    else:
+        with PhraseFilter(args, number_cache_path) as phrase_filter:
+            verdicts = reuse_stored_verdicts(
+                sentences, verdict_store, phrase_filter.verdicts
+            )
+            if profile is not None:
+                verdicts = profile.time_iterator("verdicts", verdicts)
+            with profile_stage(profile, "results", excluding="verdicts"):
+                add_verdicts_to_results(
+                    count_selected_phrases_by_source(verdicts, source_counts, start),
+                    results,
+                    case_studies,
+                    selected_index,
+                    record_file,
+                    sources,
+                    checkpointer,
+                )
+            resource_counters.update(phrase_filter.counters())
+            if profile is not None and phrase_filter.resources.profile is not None:
+                profile.update(phrase_filter.resources.profile)
+    if verdict_store is not None:
+        resource_counters.update(verdict_store.counters())
+        verdict_store.close()
+    if record_file is not None:
+        record_file.close()
+
+    # the results files are sorted in place, so the run cannot be resumed from here on
+    remove_checkpoint(output_dir)
+    with profile_stage(profile, "write results files"):
+        write_results(output_dir, filter_file_name, args, results, case_studies)
+        selected_index.save()
+
+    total = sum(counts["sentences"] for _, counts in source_counts)
+    total_lines = sum(counts["lines"] for _, counts in source_counts)
+    statistics = describe_results(results, total, total_lines)
+    if args.dedup_index:
+        statistics.append(
+            "Repeated selected phrases found in the deduplication index: "
+            + str(selected_index.previous_runs_hits)
+        )
+    statistics += describe_sources(source_counts)
+    statistics.append(f"spaCy pipeline: {get_spacy_pipeline_mode(args.verb)}")
+    statistics += describe_spelling(resource_counters)
+    statistics += describe_lexicon(resource_counters)
+    statistics += describe_number_transcription(resource_counters)
+    statistics += describe_verdict_store(resource_counters)
+    if args.workers > 1:
+        statistics.append(f"Filtered with {args.workers} workers")
+    if profile is not None:
+        # the functions of the workers are already in the profile
+        function_profile = Profile()
+        collect_function_profile(function_profile)
+        profile.update(function_profile)
+        statistics += describe_profile(profile)
+        write_profile(output_dir / f"{filter_file_name}_profile.json", profile)
     for line in statistics:
         print(line)
 
-    all_exclusion_lists = [
-        selected_options + ["---------"] + statistics,
-        selected_phrases,
-        excluded_sentences_improper_length,
-        excluded_characters,
-        excluded_acronyms,
-        excluded_words,
-        excluded_spellings,
-        excluded_ratios,
-        excluded_hours,
-        excluded_repeated_words,
-        excluded_names,
-        selected_phrases_repeated,
-        error_num,
-        possible_breaks,
-        excluded_abbreviations,
-        excluded_lowercase,
-        excluded_nums,
-        excluded_verbs,
-        selected_phrases_orig,
-    ]
-    all_exclusion_list_files = [
+    create_file(
+        output_dir,
+        filter_file_name,
         "filter_statistics.txt",
-        "selected_phrases.txt",
-        "excluded_improper_length.txt",
-        "excluded_characters.txt",
-        "excluded_acronyms.txt",
-        "excluded_words.txt",
-        "excluded_spelling.txt",
-        "excluded_proportion_of_proper_nouns.txt",
-        "excluded_hours.txt",
-        "excluded_repeated_words.txt",
-        "excluded_names.txt",
-        "selected_repeated_phrases.txt",
-        "number_transcription_errors.txt",
-        "excluded_possible_breaks.txt",
-        "excluded_abbreviations.txt",
-        "excluded_lowercase.txt",
-        "excluded_numbers.txt",
-        "excluded_verbs.txt",
-        "selected_original_phrases.txt",
-    ]
-    for exclusion_list, file in zip(all_exclusion_lists, all_exclusion_list_files):
-        create_file(output_dir, filter_file_name, file, exclusion_list)
-
-    case_studies_files = [
-        output_dir / f"{filter_file_name}_filter_case_study.tsv",
-        output_dir / f"{filter_file_name}_spelling_case_study.tsv",
-    ]
-    all_case_studies = [case_studies, spelling_case_studies]
-
-    for case_studies_file, case_study in zip(case_studies_files, all_case_studies):
-        create_case_studies_file(case_studies_file, case_study)
+        selected_options + ["---------"] + statistics,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+import bz2
+import contextlib
+import glob
+import gzip
+import locale
+import lzma
+import mmap
+import os
+import re
+import stat
+import sys
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed for .zst files
+    zstandard = None  # type: ignore[assignment]
+
+STDIN = "-"
+
+# the encoding open uses for text files, in which the byte offsets of the lines are
+# counted
+INPUT_ENCODING = locale.getpreferredencoding(False)
+
+# the line endings of a file read in text mode, which are all read as \n
+LINE_END_PATTERN = re.compile(rb"\r\n?|\n")
+
+
+def open_zstd(path: Union[str, Path], mode: str) -> Any:
+    # also used to write the compressed results files
+    if zstandard is None:
+        action = "read" if "r" in mode else "write"
+        raise IOError(f"{path}: install zstandard to {action} .zst files")
+
+    return zstandard.open(path, mode)
+
+
+COMPRESSED_FILE_OPENERS: Dict[str, Callable[[Union[str, Path], str], Any]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".zst": open_zstd,
+}
+
+
+def expand_input_paths(patterns: List[str]) -> List[str]:
+    paths = []
+    for pattern in patterns:
+        if pattern == STDIN or not glob.has_magic(pattern):
+            paths.append(pattern)
+            continue
+
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise IOError(f"No files match {pattern}")
+        paths += matches
+
+    return paths
+
+
+def open_input(path: Union[str, Path]) -> ContextManager[TextIO]:
+    if str(path) == STDIN:
+        # stdin is not closed after reading it
+        return contextlib.nullcontext(sys.stdin)
+
+    opener = COMPRESSED_FILE_OPENERS.get(Path(path).suffix)
+    if opener is None:
+        return open(path, "r")
+
+    file: TextIO = opener(path, "rt")
+    return file
+
+
+def get_input_name(path: Union[str, Path]) -> str:
+    if str(path) == STDIN:
+        return "stdin"
+
+    path = Path(path)
+    if path.suffix in COMPRESSED_FILE_OPENERS:
+        path = path.with_suffix("")
+    return path.stem
+
+
+def is_mapped_input(path: Union[str, Path]) -> bool:
+    # regular files that are not compressed are memory mapped instead of read. Pipes,
+    # /dev/stdin and process substitutions report no size and can't be mapped
+    if str(path) == STDIN or Path(path).suffix in COMPRESSED_FILE_OPENERS:
+        return False
+
+    try:
+        status = os.stat(path)
+    except OSError:  # the error is raised when the file is opened
+        return False
+    return stat.S_ISREG(status.st_mode) and status.st_size > 0
+
+
+def _split_universal_newlines(data: bytes, offset: int) -> Iterator[Tuple[str, int]]:
+    # the lines of data, which starts at offset, ending in \r, \r\n or \n
+    start = 0
+    for match in LINE_END_PATTERN.finditer(data):
+        line = data[start : match.start()].decode(INPUT_ENCODING)
+        yield line + "\n", offset + match.end()
+        start = match.end()
+    if start < len(data):
+        yield data[start:].decode(INPUT_ENCODING), offset + len(data)
+
+
+def read_mapped_lines(
+    path: Union[str, Path], start: int = 0
+) -> Iterator[Tuple[str, int]]:
+    # the lines from the byte offset start, each with the offset of the byte after it,
+    # decoded like open does, so only one line at a time is copied out of the map
+    with open(path, "rb") as f:
+        status = os.fstat(f.fileno())
+        if not stat.S_ISREG(status.st_mode) or status.st_size == 0:
+            # only regular files can be mapped, anything else is read line by line
+            if start:
+                f.seek(start)
+            yield from _read_binary_lines(f, start)
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            # most files have no \r, and then their lines are not searched for it
+            carriage_returns = mapped.find(b"\r", start) != -1
+            while start < size:
+                end = mapped.find(b"\n", start) + 1 or size
+                line = mapped[start:end]
+                if carriage_returns and b"\r" in line:
+                    yield from _split_universal_newlines(line, start)
+                else:
+                    yield line.decode(INPUT_ENCODING), end
+                start = end
+
+
+def open_binary_input(path: Union[str, Path]) -> ContextManager[BinaryIO]:
+    if str(path) == STDIN:
+        return contextlib.nullcontext(sys.stdin.buffer)
+
+    opener = COMPRESSED_FILE_OPENERS.get(Path(path).suffix)
+    if opener is None:
+        return open(path, "rb")
+
+    file: BinaryIO = opener(path, "rb")
+    return file
+
+
+def _read_binary_lines(f: BinaryIO, offset: int) -> Iterator[Tuple[str, int]]:
+    # the lines of f, which is at the byte offset, decoded like open does. The offsets
+    # are counted here, since tell on a decompressed text file rebuilds its decoder
+    for line in f:
+        if b"\r" in line:
+            yield from _split_universal_newlines(line, offset)
+        else:
+            yield line.decode(INPUT_ENCODING), offset + len(line)
+        offset += len(line)
+
+
+def _read_text_lines(
+    path: Union[str, Path], start: int, offsets: bool
+) -> Iterator[Tuple[str, int]]:
+    if offsets:
+        with open_binary_input(path) as binary_file:
+            if start:
+                binary_file.seek(start)
+            yield from _read_binary_lines(binary_file, start)
+        return
+
+    with open_input(path) as f:
+        if start:
+            f.seek(start)
+        for line in f:
+            yield line, 0
+
+
+def read_input_lines(
+    path: Union[str, Path], start: int = 0, offsets: bool = False
+) -> Iterator[Tuple[str, int]]:
+    # the lines of path from the offset start, each with the offset after it. The
+    # offsets of compressed files are those of the decompressed text, and are only
+    # known with offsets, since their lines have to be read one by one
+    if is_mapped_input(path):
+        return read_mapped_lines(path, start)
+
+    return _read_text_lines(path, start, offsets)
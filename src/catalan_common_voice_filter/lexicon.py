@@ -0,0 +1,340 @@
+import logging
+import mmap
+import re
+import struct
+import sys
+import time
+from argparse import ArgumentParser
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
+
+import hunspell
+
+from catalan_common_voice_filter.constants import DATA_DIR
+
+logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+
+LEXICON_MAGIC = b"CVLEX001"
+
+# magic and number of words, followed by number of words + 1 offsets and the words
+LEXICON_HEADER = struct.Struct("<8sI")
+
+LEXICON_FILE_NAME = "ca.lexicon"
+
+
+class Affix(NamedTuple):
+    flag: str
+    cross_product: bool
+    strip: str
+    add: str
+    continuation: FrozenSet[str]
+    condition: Pattern[str]
+
+
+class AffixRules(NamedTuple):
+    prefixes: Dict[str, List[Affix]]
+    suffixes: Dict[str, List[Affix]]
+    flag_type: str
+    forbidden_flag: Optional[str]
+    full_strip: bool
+
+
+def split_flags(flags: str, flag_type: str) -> List[str]:
+    if flag_type == "long":
+        return [flags[i : i + 2] for i in range(0, len(flags), 2)]
+    if flag_type == "num":
+        return flags.split(",")
+
+    return list(flags)
+
+
+def _condition_to_regex(condition: str, suffix: bool) -> Pattern[str]:
+    regex = ""
+    in_class = False
+    for char in condition:
+        if char == "[":
+            in_class = True
+            regex += "["
+        elif char == "]":
+            in_class = False
+            regex += "]"
+        elif char == "^" and regex.endswith("[") and in_class:
+            regex += "^"
+        elif char == "." and not in_class:
+            regex += "."
+        else:
+            regex += re.escape(char)
+
+    return re.compile(regex + "$" if suffix else "^" + regex)
+
+
+def read_affix_file(aff_path: Path) -> AffixRules:
+    prefixes: Dict[str, List[Affix]] = {}
+    suffixes: Dict[str, List[Affix]] = {}
+    flag_type = "char"
+    forbidden_flag = None
+    full_strip = False
+    cross_products: Dict[Tuple[str, str], bool] = {}
+
+    with open(aff_path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+
+            if fields[0] == "FLAG":
+                flag_type = fields[1]
+            elif fields[0] == "FORBIDDENWORD":
+                forbidden_flag = fields[1]
+            elif fields[0] == "FULLSTRIP":
+                full_strip = True
+            elif fields[0] in ("PFX", "SFX") and len(fields) == 4:
+                cross_products[(fields[0], fields[1])] = fields[2] == "Y"
+            elif fields[0] in ("PFX", "SFX") and len(fields) >= 5:
+                kind, flag, strip, add, condition = fields[:5]
+                add, _, continuation = add.partition("/")
+                affix = Affix(
+                    flag,
+                    cross_products[(kind, flag)],
+                    "" if strip == "0" else strip,
+                    "" if add == "0" else add,
+                    frozenset(split_flags(continuation, flag_type)),
+                    _condition_to_regex(condition, kind == "SFX"),
+                )
+                affixes = suffixes if kind == "SFX" else prefixes
+                affixes.setdefault(flag, []).append(affix)
+
+    return AffixRules(prefixes, suffixes, flag_type, forbidden_flag, full_strip)
+
+
+def read_dictionary_file(dic_path: Path) -> Iterator[Tuple[str, str]]:
+    with open(dic_path, "r", encoding="utf-8") as f:
+        next(f)  # number of words
+        for line in f:
+            entry = line.split()
+            if not entry:
+                continue
+
+            word, _, flags = entry[0].partition("/")
+            yield word, flags
+
+
+def apply_suffix(suffix: Affix, word: str, full_strip: bool) -> Optional[str]:
+    if not word.endswith(suffix.strip) or not suffix.condition.search(word):
+        return None
+    if len(suffix.strip) >= len(word) and not full_strip:
+        return None
+
+    return word[: len(word) - len(suffix.strip)] + suffix.add
+
+
+def apply_prefix(prefix: Affix, word: str, full_strip: bool) -> Optional[str]:
+    if not word.startswith(prefix.strip) or not prefix.condition.search(word):
+        return None
+    if len(prefix.strip) >= len(word) and not full_strip:
+        return None
+
+    return prefix.add + word[len(prefix.strip) :]
+
+
+def expand_word(word: str, flags: List[str], rules: AffixRules) -> Set[str]:
+    # the word, the word with one or two suffixes, and with a prefix on top of the word
+    # or of a suffixed form that allows it
+    forms = {word}
+    suffixed_forms: List[Tuple[str, bool, FrozenSet[str]]] = []
+
+    for flag in flags:
+        for suffix in rules.suffixes.get(flag, []):
+            form = apply_suffix(suffix, word, rules.full_strip)
+            if form is None or rules.forbidden_flag in suffix.continuation:
+                continue
+
+            forms.add(form)
+            suffixed_forms.append((form, suffix.cross_product, suffix.continuation))
+            for second_flag in suffix.continuation:
+                for second_suffix in rules.suffixes.get(second_flag, []):
+                    second_form = apply_suffix(second_suffix, form, rules.full_strip)
+                    if second_form is not None and (
+                        rules.forbidden_flag not in second_suffix.continuation
+                    ):
+                        forms.add(second_form)
+
+    for flag in flags:
+        for prefix in rules.prefixes.get(flag, []):
+            prefixed_form = apply_prefix(prefix, word, rules.full_strip)
+            if prefixed_form is not None:
+                forms.add(prefixed_form)
+
+    for form, cross_product, continuation in suffixed_forms:
+        for flag in set(flags) | continuation:
+            for prefix in rules.prefixes.get(flag, []):
+                allowed = flag in continuation or (
+                    flag in flags and cross_product and prefix.cross_product
+                )
+                if not allowed:
+                    continue
+
+                prefixed_form = apply_prefix(prefix, form, rules.full_strip)
+                if prefixed_form is not None:
+                    forms.add(prefixed_form)
+
+    return forms
+
+
+def expand_dictionary(dic_path: Path, aff_path: Path) -> Set[str]:
+    # spell() is only asked about alphabetic tokens, so forms with apostrophes, hyphens or
+    # middle dots are not kept
+    rules = read_affix_file(aff_path)
+    forms: Set[str] = set()
+    forbidden_words: Set[str] = set()
+
+    for word, flags in read_dictionary_file(dic_path):
+        word_flags = split_flags(flags, rules.flag_type)
+        if rules.forbidden_flag in word_flags:
+            forbidden_words.add(word)
+            continue
+
+        forms.update(
+            form for form in expand_word(word, word_flags, rules) if form.isalpha()
+        )
+
+    return forms - forbidden_words
+
+
+def write_lexicon(path: Path, words: Iterable[str]) -> int:
+    encoded_words = sorted({word.encode() for word in words})
+    offsets = array("I", [0])
+    for word in encoded_words:
+        offsets.append(offsets[-1] + len(word))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+
+    with open(path, "wb") as f:
+        f.write(LEXICON_HEADER.pack(LEXICON_MAGIC, len(encoded_words)))
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded_words))
+
+    return len(encoded_words)
+
+
+class Lexicon:
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = LEXICON_HEADER.unpack_from(self._map)
+        self._count: int = count
+        if magic != LEXICON_MAGIC:
+            raise IOError(f"{path} is not a lexicon file")
+
+        offsets_end = LEXICON_HEADER.size + 4 * (self._count + 1)
+        if sys.byteorder == "big":
+            offsets = array("I", self._map[LEXICON_HEADER.size : offsets_end])
+            offsets.byteswap()
+            self._offsets = memoryview(offsets)
+        else:
+            self._offsets = memoryview(self._map)[
+                LEXICON_HEADER.size : offsets_end
+            ].cast("I")
+        self._words_start = offsets_end
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._words_start + self._offsets[index]
+        end = self._words_start + self._offsets[index + 1]
+        return self._map[start:end]
+
+    def __contains__(self, word: str) -> bool:
+        key = word.encode()
+        index = bisect_left(self, key)  # type: ignore[call-overload]
+        return index < self._count and self[index] == key
+
+
+def _is_capitalized(word: str) -> bool:
+    return word[:1].isupper() and word[1:].islower()
+
+
+class LexiconSpellChecker:
+    def __init__(self, lexicon: Lexicon, dic: Any) -> None:
+        self.lexicon = lexicon
+        self.dic = dic
+        self.hits = 0
+        self.fallbacks = 0
+
+    def spell(self, word: str) -> bool:
+        # like Hunspell, a capitalized word is also correct if it is correct in lowercase
+        if word in self.lexicon or (
+            _is_capitalized(word) and word.lower() in self.lexicon
+        ):
+            self.hits += 1
+            return True
+
+        self.fallbacks += 1
+        return bool(self.dic.spell(word))
+
+    def counters(self) -> "Counter[str]":
+        counters: "Counter[str]" = Counter()
+        counters["lexicon hits"] = self.hits
+        counters["lexicon fallbacks"] = self.fallbacks
+        return counters
+
+
+def describe_lexicon(counters: "Counter[str]") -> List[str]:
+    if "lexicon hits" not in counters:
+        return []
+
+    return [
+        f"Lexicon: {counters['lexicon hits']} words found, "
+        f"{counters['lexicon fallbacks']} checked by Hunspell"
+    ]
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--dic", dest="dic", default=str(DATA_DIR / "ca.dic"))
+    parser.add_argument("--aff", dest="aff", default=str(DATA_DIR / "ca.aff"))
+    parser.add_argument(
+        "--output",
+        "-o",
+        dest="output",
+        default=str(DATA_DIR / LEXICON_FILE_NAME),
+        help="File the lexicon is written to",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    forms = expand_dictionary(Path(args.dic), Path(args.aff))
+    logging.info(f"{len(forms)} words expanded from {args.dic}")
+
+    # the lexicon must never accept a word that Hunspell rejects, and Hunspell also rejects
+    # some forms of words that have a forbidden homonym
+    dic = hunspell.HunSpell(args.dic, args.aff)
+    rejected = {form for form in forms if not dic.spell(form)}
+    forms -= rejected
+    logging.info(f"{len(rejected)} words rejected by Hunspell")
+
+    count = write_lexicon(Path(args.output), forms)
+    logging.info(
+        f"{count} words written to {args.output} in {round(time.perf_counter() - start, 1)} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+import itertools
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from lingua_franca.format import pronounce_number
+
+from catalan_common_voice_filter.caches import LRUCache, PersistentStore
+from catalan_common_voice_filter.constants import CATALAN_NUMBER_WORDS
+
+NUMBER_BACKENDS = ["native", "apertium"]
+
+# "-z" makes apertium flush its output after every null character, so a single
+# process can answer many requests
+APERTIUM_COMMAND = ["apertium", "-z", "eng-cat"]
+
+# keeps every request smaller than the pipe buffer so writing it can never block
+MAX_APERTIUM_REQUEST_BYTES = 16384
+
+NUMBER_CACHE_SIZE = 100000
+
+NUMBER_CACHE_FILE_NAME = "number_transcription_cache.sqlite3"
+
+
+def pronounce_number_in_english(number: int, ordinals: bool = False) -> str:
+    try:
+        return str(pronounce_number(number, "en", ordinals=ordinals))
+    except (KeyError, ValueError) as err:
+        raise IOError(f"Could not pronounce number {number}: {err!r}")
+
+
+def translate_number_words_to_catalan(number_in_english: str) -> str:
+    catalan_words = []
+    for word in number_in_english.split(" "):
+        separator = ""
+        if word.endswith(","):
+            word, separator = word[:-1], ","
+
+        if word not in CATALAN_NUMBER_WORDS:
+            raise IOError(
+                f"No Catalan transcription for '{word}' in '{number_in_english}'"
+            )
+        catalan_words.append(CATALAN_NUMBER_WORDS[word] + separator)
+
+    return " ".join(catalan_words)
+
+
+def spell_number_in_catalan(number: int, ordinals: bool = False) -> str:
+    number_in_english = pronounce_number_in_english(number, ordinals)
+    return translate_number_words_to_catalan(number_in_english)
+
+
+def transcribe_number_in_catalan(number: int, hour: bool = False) -> str:
+    number_in_catalan = spell_number_in_catalan(number)
+    if hour:
+        return number_in_catalan + " hores"
+
+    return number_in_catalan
+
+
+def find_numbers(lines: Iterable[str]) -> List[int]:
+    numbers = {int(number) for line in lines for number in re.findall(r"\d+", line)}
+    return sorted(numbers)
+
+
+def _split_into_requests(texts: Sequence[str]) -> Iterator[List[str]]:
+    request: List[str] = []
+    request_size = 0
+    for text in texts:
+        text_size = len(text.encode()) + 1
+        if request and request_size + text_size > MAX_APERTIUM_REQUEST_BYTES:
+            yield request
+            request, request_size = [], 0
+        request.append(text)
+        request_size += text_size
+
+    if request:
+        yield request
+
+
+class ApertiumWorker:
+    def __init__(self, command: Sequence[str] = APERTIUM_COMMAND) -> None:
+        self.command = list(command)
+        self.requests = 0
+        self.translations = 0
+        self.restarts = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+        self._process: Optional["subprocess.Popen[bytes]"] = None
+        self._start()
+
+    def _start(self) -> None:
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _restart(self) -> None:
+        self.close()
+        self.restarts += 1
+        self._start()
+
+    def _round_trip(self, request: bytes) -> bytes:
+        assert self._process is not None
+        assert self._process.stdin is not None and self._process.stdout is not None
+
+        try:
+            self._process.stdin.write(request + b"\0")
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            raise IOError(f"{' '.join(self.command)} is not running")
+
+        response = b""
+        while not response.endswith(b"\0"):
+            data = os.read(self._process.stdout.fileno(), 65536)
+            if not data:
+                raise IOError(f"{' '.join(self.command)} exited unexpectedly")
+            response += data
+
+        return response[:-1]
+
+    def translate(self, texts: Sequence[str]) -> List[str]:
+        translations: List[str] = []
+        with self._lock:
+            for request in _split_into_requests(texts):
+                start = time.perf_counter()
+                encoded_request = "\n".join(request).encode()
+                try:
+                    response = self._round_trip(encoded_request)
+                except IOError:
+                    self._restart()
+                    response = self._round_trip(encoded_request)
+                seconds = time.perf_counter() - start
+
+                self.requests += 1
+                self.translations += len(request)
+                self.total_seconds += seconds
+
+                lines = response.decode().strip("\n").split("\n")
+                if len(lines) != len(request):
+                    raise IOError(
+                        f"apertium returned {len(lines)} lines for {len(request)} numbers"
+                    )
+                translations.extend(line.strip() for line in lines)
+
+        return translations
+
+    def counters(self) -> "Counter[str]":
+        return Counter(
+            requests=self.requests,
+            numbers=self.translations,
+            milliseconds=round(self.total_seconds * 1000),
+            restarts=self.restarts,
+        )
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin is not None:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+        self._process = None
+
+
+class ApertiumPool:
+    def __init__(
+        self, workers: int = 1, command: Sequence[str] = APERTIUM_COMMAND
+    ) -> None:
+        self.workers = [ApertiumWorker(command) for _ in range(max(workers, 1))]
+        self._next_worker = itertools.cycle(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.workers))
+
+    def translate(self, texts: Sequence[str]) -> List[str]:
+        if len(texts) <= 1 or len(self.workers) == 1:
+            return next(self._next_worker).translate(texts)
+
+        share = -(-len(texts) // len(self.workers))
+        batches = [texts[i : i + share] for i in range(0, len(texts), share)]
+        results = self._executor.map(
+            lambda worker, batch: worker.translate(batch), self.workers, batches
+        )
+        return [translation for result in results for translation in result]
+
+    def counters(self) -> "Counter[str]":
+        counters: "Counter[str]" = Counter()
+        for index, worker in enumerate(self.workers):
+            for name, value in worker.counters().items():
+                counters[f"apertium worker {index} {name}"] = value
+
+        return counters
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for worker in self.workers:
+            worker.close()
+
+
+class NumberTranscriber:
+    def __init__(
+        self,
+        backend: str = "native",
+        apertium_workers: int = 1,
+        apertium_command: Sequence[str] = APERTIUM_COMMAND,
+        cache_size: int = NUMBER_CACHE_SIZE,
+        cache_path: Optional[Path] = None,
+    ) -> None:
+        self.backend = backend
+        self.pool = (
+            ApertiumPool(apertium_workers, apertium_command)
+            if backend == "apertium"
+            else None
+        )
+        self.cache: LRUCache[Tuple[int, bool], str] = LRUCache(cache_size)
+        self.persistent_cache = (
+            PersistentStore(cache_path, "number_transcriptions")
+            if cache_path is not None
+            else None
+        )
+        self._prefetched: Dict[int, str] = {}
+
+    def _persistent_key(self, number: int, hour: bool) -> str:
+        return f"{self.backend}:{number}:{int(hour)}"
+
+    def _is_cached(self, number: int) -> bool:
+        for hour in (False, True):
+            if (number, hour) in self.cache:
+                return True
+            if (
+                self.persistent_cache is not None
+                and self._persistent_key(number, hour) in self.persistent_cache
+            ):
+                return True
+
+        return False
+
+    def prefetch(self, numbers: Iterable[int]) -> None:
+        if self.pool is None:
+            return
+
+        numbers_in_english = {}
+        for number in numbers:
+            if self._is_cached(number):
+                continue
+            try:
+                numbers_in_english[number] = pronounce_number_in_english(number)
+            except IOError:
+                continue
+
+        try:
+            translations = self.pool.translate(list(numbers_in_english.values()))
+        except IOError as err:
+            logging.error(err)
+            self._prefetched = {}
+            return
+        self._prefetched = dict(zip(numbers_in_english.keys(), translations))
+
+    def _translate(self, number: int) -> str:
+        if self.pool is None:
+            return spell_number_in_catalan(number)
+
+        if number in self._prefetched:
+            return self._prefetched[number]
+
+        return self.pool.translate([pronounce_number_in_english(number)])[0]
+
+    def __call__(self, number: int, hour: bool = False) -> str:
+        transcription = self.cache.get((number, hour))
+        if transcription is not None:
+            return transcription
+
+        if self.persistent_cache is not None:
+            transcription = self.persistent_cache.get(
+                self._persistent_key(number, hour)
+            )
+
+        if transcription is None:
+            transcription = self._translate(number)
+            if hour:
+                transcription += " hores"
+            if self.persistent_cache is not None:
+                self.persistent_cache.put(
+                    self._persistent_key(number, hour), transcription
+                )
+
+        self.cache.put((number, hour), transcription)
+        return transcription
+
+    def counters(self) -> "Counter[str]":
+        counters: "Counter[str]" = Counter()
+        counters["cache hits"] = self.cache.hits
+        counters["cache misses"] = self.cache.misses
+        if self.persistent_cache is not None:
+            counters["disk cache hits"] = self.persistent_cache.hits
+            counters["disk cache misses"] = self.persistent_cache.misses
+        if self.pool is not None:
+            counters.update(self.pool.counters())
+
+        return counters
+
+    def commit(self) -> None:
+        if self.persistent_cache is not None:
+            self.persistent_cache.commit()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+
+
+def describe_number_transcription(counters: "Counter[str]") -> List[str]:
+    lookups = counters["cache hits"] + counters["cache misses"]
+    hit_rate = counters["cache hits"] * 100 / lookups if lookups else 0.0
+    description = [
+        f"Number transcription cache: {counters['cache hits']} hits, "
+        f"{counters['cache misses']} misses ({round(hit_rate, 2)}%)"
+    ]
+    if "disk cache hits" in counters:
+        description.append(
+            f"Number transcription disk cache: {counters['disk cache hits']} hits, "
+            f"{counters['disk cache misses']} misses"
+        )
+
+    index = 0
+    while f"apertium worker {index} requests" in counters:
+        prefix = f"apertium worker {index}"
+        requests = counters[f"{prefix} requests"]
+        average_ms = counters[f"{prefix} milliseconds"] / requests if requests else 0
+        description.append(
+            f"Apertium worker {index}: {requests} requests, "
+            f"{counters[f'{prefix} numbers']} numbers, {round(average_ms, 2)} ms average, "
+            f"{counters[f'{prefix} restarts']} restarts"
+        )
+        index += 1
+
+    return description
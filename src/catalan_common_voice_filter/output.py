@@ -0,0 +1,163 @@
+import gzip
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Union
+
+from catalan_common_voice_filter.input_files import open_zstd
+
+SORT_RUN_SIZE = 1000000
+
+# lines joined into a single write when writing a results file
+WRITE_BUFFER_LINES = 10000
+
+# the level of the gzip command, much faster than the default of gzip.open
+GZIP_COMPRESS_LEVEL = 6
+
+
+def _open_gzip(path: Union[str, Path], mode: str) -> Any:
+    return gzip.open(path, mode, compresslevel=GZIP_COMPRESS_LEVEL)
+
+
+OUTPUT_COMPRESSIONS: Dict[str, Callable[[Union[str, Path], str], Any]] = {
+    "gz": _open_gzip,
+    "zst": open_zstd,
+}
+
+
+def get_output_path(path: Path, compression: Optional[str] = None) -> Path:
+    if compression is None:
+        return path
+
+    return path.with_name(f"{path.name}.{compression}")
+
+
+def open_output(path: Path, compression: Optional[str] = None) -> TextIO:
+    if compression is None:
+        return open(path, "w", newline="\n")
+
+    if compression not in OUTPUT_COMPRESSIONS:
+        raise ValueError(f"Unknown output compression: {compression}")
+    file: TextIO = OUTPUT_COMPRESSIONS[compression](path, "wt")
+    return file
+
+
+def write_lines(
+    path: Path, lines: Iterable[str], compression: Optional[str] = None
+) -> None:
+    # the lines are joined in buffers of WRITE_BUFFER_LINES lines, so there is a write
+    # per buffer instead of one per line
+    lines = iter(lines)
+    with open_output(get_output_path(path, compression), compression) as f:
+        while True:
+            buffer = list(itertools.islice(lines, WRITE_BUFFER_LINES))
+            if not buffer:
+                break
+            f.write("\n".join(buffer) + "\n")
+
+
+def compress_file(path: Path, compression: str) -> None:
+    # the file is replaced by its compressed version
+    if compression not in OUTPUT_COMPRESSIONS:
+        raise ValueError(f"Unknown output compression: {compression}")
+
+    with open(path, "rb") as f, OUTPUT_COMPRESSIONS[compression](
+        get_output_path(path, compression), "wb"
+    ) as compressed_file:
+        shutil.copyfileobj(f, compressed_file)
+    os.remove(path)
+
+
+def run_in_threads(tasks: List[Callable[[], None]], threads: int = 1) -> None:
+    # compressing, writing and sorting files mostly release the GIL, so several files
+    # can be written at the same time
+    if threads <= 1:
+        for task in tasks:
+            task()
+        return
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        for future in futures:
+            future.result()
+
+
+class ResultsFile:
+    def __init__(self, path: Path, size: Optional[int] = None, count: int = 0) -> None:
+        # with a size, the lines of a previous run up to that size are kept
+        self.path = path
+        self.count = count
+        if size is None:
+            self._file = open(path, "w", newline="\n")
+        else:
+            os.truncate(path, size)
+            self._file = open(path, "a", newline="\n")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _write_line(self, line: str) -> None:
+        self._file.write(line + "\n")
+        self.count += 1
+
+    def flush(self) -> int:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CategoryFile(ResultsFile):
+    def append(self, line: str) -> None:
+        self._write_line(line)
+
+
+class CaseStudyFile(ResultsFile):
+    def append(self, phrase: List[str]) -> None:
+        self._write_line(phrase[1] + "\t" + phrase[0])
+
+
+def _line_without_newline(line: str) -> str:
+    return line[:-1]
+
+
+def _write_sorted_run(lines: List[str], directory: Path) -> TextIO:
+    lines.sort(key=_line_without_newline)
+    run = tempfile.TemporaryFile("w+", dir=directory, newline="\n")
+    run.writelines(lines)
+    run.seek(0)
+    return run
+
+
+def sort_file(
+    path: Path, run_size: int = SORT_RUN_SIZE, compression: Optional[str] = None
+) -> None:
+    # external merge sort: sorted runs of run_size lines are written to temporary
+    # files and merged, so memory does not depend on the size of the file. With a
+    # compression, the sorted lines are compressed while they are merged and the file
+    # is replaced by its compressed version
+    runs = []
+    try:
+        with open(path, "r", newline="\n") as f:
+            while True:
+                lines = list(itertools.islice(f, run_size))
+                if not lines:
+                    break
+                runs.append(_write_sorted_run(lines, path.parent))
+
+        output_path = get_output_path(path, compression)
+        sorted_path = output_path.with_name(output_path.name + ".sorted")
+        with open_output(sorted_path, compression) as f:
+            f.writelines(heapq.merge(*runs, key=_line_without_newline))
+        os.replace(sorted_path, output_path)
+        if output_path != path:
+            os.remove(path)
+    finally:
+        for run in runs:
+            run.close()
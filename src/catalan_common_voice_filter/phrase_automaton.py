@@ -0,0 +1,88 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# characters that are part of a word, besides letters and digits
+WORD_CHARACTERS = "·"
+
+
+def is_word_boundary(text: str, index: int) -> bool:
+    # whether index is outside text or at a character that cannot be part of a word
+    if index < 0 or index >= len(text):
+        return True
+
+    return not (text[index].isalnum() or text[index] in WORD_CHARACTERS)
+
+
+class PhraseAutomaton:
+    # an Aho-Corasick automaton that finds any of the phrases in a text in a single pass
+    def __init__(self, phrases: Iterable[str], casefold: bool = False) -> None:
+        self.casefold = casefold
+        self.phrases: List[str] = []
+        self._keys: List[str] = []
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._failures: List[int] = [0]
+        # the phrases that end at every state, including those of its failure states
+        self._outputs: List[List[int]] = [[]]
+
+        for phrase in phrases:
+            self._add(phrase)
+        self._build_failures()
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _key(self, text: str) -> str:
+        return text.casefold() if self.casefold else text
+
+    def _add(self, phrase: str) -> None:
+        key = self._key(phrase)
+        state = 0
+        for char in key:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions[state][char] = next_state
+                self._transitions.append({})
+                self._failures.append(0)
+                self._outputs.append([])
+            state = next_state
+
+        self._outputs[state].append(len(self.phrases))
+        self.phrases.append(phrase)
+        self._keys.append(key)
+
+    def _build_failures(self) -> None:
+        states = deque(self._transitions[0].values())
+        while states:
+            state = states.popleft()
+            for char, next_state in self._transitions[state].items():
+                states.append(next_state)
+                failure = self._failures[state]
+                while failure and char not in self._transitions[failure]:
+                    failure = self._failures[failure]
+                self._failures[next_state] = self._transitions[failure].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._failures[next_state]]
+
+    def find(self, text: str) -> Optional[str]:
+        # the first phrase of text that starts and ends at word boundaries, the longest
+        # of those that start at the same position
+        key = self._key(text)
+        found: Optional[Tuple[int, int, int]] = None
+        state = 0
+        for end, char in enumerate(key):
+            while state and char not in self._transitions[state]:
+                state = self._failures[state]
+            state = self._transitions[state].get(char, 0)
+
+            for phrase in self._outputs[state]:
+                start = end - len(self._keys[phrase]) + 1
+                if not (
+                    is_word_boundary(key, start - 1) and is_word_boundary(key, end + 1)
+                ):
+                    continue
+
+                candidate = (start, -len(self._keys[phrase]), phrase)
+                if found is None or candidate < found:
+                    found = candidate
+
+        return self.phrases[found[2]] if found is not None else None
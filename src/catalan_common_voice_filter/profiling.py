@@ -0,0 +1,186 @@
+import cProfile
+import json
+import os
+import pstats
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+# functions shown in the statistics file, all of them are in the JSON file
+PROFILE_TOP_FUNCTIONS = 20
+
+# the function profiler of this process, with the pid it was started in, since forked
+# worker processes inherit the one of their parent
+_function_profiler: Optional[Tuple[int, cProfile.Profile]] = None
+
+
+class Profile:
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: "Counter[str]" = Counter()
+        self.rejections: Dict[str, "Counter[str]"] = {}
+        self.function_seconds: Dict[str, float] = defaultdict(float)
+        self.function_calls: "Counter[str]" = Counter()
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        self.seconds[stage] += seconds
+        self.calls[stage] += calls
+
+    @contextmanager
+    def stage(
+        self, name: str, calls: int = 1, excluding: Optional[str] = None
+    ) -> Iterator[None]:
+        # the time of the stage excluding is not added to the one of this stage
+        excluded_seconds = self.seconds[excluding] if excluding else 0.0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if excluding:
+                excluded_seconds = self.seconds[excluding] - excluded_seconds
+            self.add(name, time.perf_counter() - start - excluded_seconds, calls)
+
+    def time_iterator(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start, 0)
+                return
+            self.add(stage, time.perf_counter() - start)
+            yield item
+
+    def add_rejection(self, stage: str, reason: str) -> None:
+        self.rejections.setdefault(stage, Counter())[reason] += 1
+
+    def update(self, other: "Profile") -> None:
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] += seconds
+        self.calls.update(other.calls)
+        for stage, reasons in other.rejections.items():
+            self.rejections.setdefault(stage, Counter()).update(reasons)
+        for function, seconds in other.function_seconds.items():
+            self.function_seconds[function] += seconds
+        self.function_calls.update(other.function_calls)
+
+    def slowest_functions(self) -> List[Tuple[str, float]]:
+        return sorted(
+            self.function_seconds.items(), key=lambda item: item[1], reverse=True
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "stages": {
+                stage: {"seconds": round(seconds, 6), "calls": self.calls[stage]}
+                for stage, seconds in self.seconds.items()
+            },
+            "rejections": {
+                stage: dict(reasons) for stage, reasons in self.rejections.items()
+            },
+            "functions": {
+                function: {
+                    "cumulative_seconds": round(seconds, 6),
+                    "calls": self.function_calls[function],
+                }
+                for function, seconds in self.slowest_functions()
+            },
+        }
+
+
+def profile_stage(
+    profile: Optional[Profile],
+    name: str,
+    calls: int = 1,
+    excluding: Optional[str] = None,
+) -> ContextManager[None]:
+    if profile is None:
+        return nullcontext()
+
+    return profile.stage(name, calls, excluding)
+
+
+def start_function_profiling() -> None:
+    global _function_profiler
+
+    if _function_profiler is not None and _function_profiler[0] == os.getpid():
+        return
+
+    # the inherited profiler would stop the new one when it is freed
+    if _function_profiler is not None:
+        _function_profiler[1].disable()
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _function_profiler = (os.getpid(), profiler)
+
+
+def collect_function_profile(profile: Profile) -> None:
+    # the times of the functions of the package since profiling started in this process,
+    # replacing the ones collected before
+    if _function_profiler is None or _function_profiler[0] != os.getpid():
+        return
+
+    profiler = _function_profiler[1]
+    profiler.disable()
+    stats: Dict[Tuple[str, int, str], Tuple[Any, ...]] = pstats.Stats(
+        profiler
+    ).stats  # type: ignore[attr-defined]
+    profiler.enable()
+
+    function_seconds: Dict[str, float] = defaultdict(float)
+    function_calls: "Counter[str]" = Counter()
+    for (filename, _, name), (_, calls, _, cumulative_seconds, _) in stats.items():
+        path = Path(filename)
+        if path.parent != PACKAGE_DIR:
+            continue
+
+        function_seconds[f"{path.stem}.{name}"] += cumulative_seconds
+        function_calls[f"{path.stem}.{name}"] += calls
+    profile.function_seconds = function_seconds
+    profile.function_calls = function_calls
+
+
+def describe_profile(profile: Optional[Profile]) -> List[str]:
+    # every line starts with Profile, since the lines of the statistics file are sorted
+    if profile is None:
+        return []
+
+    lines = [
+        f"Profile stage {stage}: {round(seconds, 3)} s, {profile.calls[stage]} calls"
+        for stage, seconds in profile.seconds.items()
+    ]
+    for stage, reasons in profile.rejections.items():
+        lines.append(
+            f"Profile stage {stage}: {sum(reasons.values())} sentences rejected ("
+            + ", ".join(f"{reason}: {count}" for reason, count in reasons.most_common())
+            + ")"
+        )
+    lines += [
+        f"Profile function {function}: {round(seconds, 3)} s cumulative, "
+        f"{profile.function_calls[function]} calls"
+        for function, seconds in profile.slowest_functions()[:PROFILE_TOP_FUNCTIONS]
+    ]
+    return lines
+
+
+def write_profile(path: Path, profile: Profile) -> None:
+    with open(path, "w") as f:
+        json.dump(profile.to_json(), f, indent=2)
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Union
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is only needed for Parquet and Arrow records
+    pyarrow = None
+
+RECORD_FORMATS = ["jsonl", "parquet", "arrow"]
+
+# number of records in every row group of a Parquet file, or record batch of an Arrow file
+RECORD_BATCH_SIZE = 10000
+
+
+class SentenceSource(NamedTuple):
+    # the line of the input a sentence was read from, and the byte offset where the
+    # sentence starts (unknown for stdin)
+    file: str
+    line: int
+    offset: Optional[int]
+
+
+class SentenceRecord(NamedTuple):
+    source: str
+    line: int
+    offset: Optional[int]
+    original: str
+    normalized: Optional[str]
+    accepted: bool
+    reason: Optional[str]
+    reasons: List[str]
+    token: Optional[str]
+
+
+class JsonlRecordFile:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8", newline="\n")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, record: SentenceRecord) -> None:
+        self._file.write(json.dumps(record._asdict(), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _record_schema() -> Any:
+    return pyarrow.schema(
+        [
+            ("source", pyarrow.string()),
+            ("line", pyarrow.int64()),
+            ("offset", pyarrow.int64()),
+            ("original", pyarrow.string()),
+            ("normalized", pyarrow.string()),
+            ("accepted", pyarrow.bool_()),
+            ("reason", pyarrow.string()),
+            ("reasons", pyarrow.list_(pyarrow.string())),
+            ("token", pyarrow.string()),
+        ]
+    )
+
+
+class ArrowRecordFile:
+    # the records are written in batches, which are the row groups of a Parquet file or
+    # the record batches of an Arrow IPC file
+    def __init__(self, path: Path, record_format: str) -> None:
+        if pyarrow is None:
+            raise IOError(f"{path}: install pyarrow to write {record_format} records")
+
+        self.path = path
+        self.count = 0
+        self._schema = _record_schema()
+        self._batch: List[SentenceRecord] = []
+        if record_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(path, self._schema)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, record: SentenceRecord) -> None:
+        self._batch.append(record)
+        self.count += 1
+        if len(self._batch) == RECORD_BATCH_SIZE:
+            self._write_batch()
+
+    def _write_batch(self) -> None:
+        self._writer.write_table(
+            pyarrow.Table.from_pylist(
+                [record._asdict() for record in self._batch], self._schema
+            )
+        )
+        self._batch = []
+
+    def close(self) -> None:
+        if self._batch:
+            self._write_batch()
+        self._writer.close()
+
+
+RecordFile = Union[JsonlRecordFile, ArrowRecordFile]
+
+
+def open_record_file(path: Path, record_format: str) -> RecordFile:
+    if record_format not in RECORD_FORMATS:
+        raise ValueError(f"Unknown record format: {record_format}")
+
+    if record_format == "jsonl":
+        return JsonlRecordFile(path)
+    return ArrowRecordFile(path, record_format)
@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from argparse import ArgumentParser
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from catalan_common_voice_filter.filter_phrases import (
+    FilterResult,
+    PhraseFilter,
+    parse_filter_options,
+)
+
+logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+
+SERVER_PORT = 8080
+
+MAX_REQUEST_BYTES = 10 * 1024 * 1024
+
+# number of recent requests the latency percentiles are computed from
+LATENCY_WINDOW = 1000
+
+
+class ServerMetrics:
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.requests = 0
+        self.sentences = 0
+        self.errors = 0
+        self.filtering_seconds = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record_request(self, seconds: float, sentences: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.sentences += sentences
+            self.filtering_seconds += seconds
+            self.latencies.append(seconds)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "uptime_seconds": round(time.monotonic() - self.started, 3),
+                "requests": self.requests,
+                "sentences": self.sentences,
+                "errors": self.errors,
+                "average_latency_ms": _milliseconds(
+                    self.filtering_seconds / self.requests if self.requests else 0.0
+                ),
+                "p50_latency_ms": _milliseconds(_percentile(latencies, 50)),
+                "p95_latency_ms": _milliseconds(_percentile(latencies, 95)),
+                "sentences_per_second": round(
+                    self.sentences / self.filtering_seconds
+                    if self.filtering_seconds
+                    else 0.0,
+                    2,
+                ),
+            }
+
+
+def _milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _percentile(sorted_values: List[float], percentile: int) -> float:
+    if not sorted_values:
+        return 0.0
+
+    index = min(len(sorted_values) - 1, len(sorted_values) * percentile // 100)
+    return sorted_values[index]
+
+
+def result_to_json(sentence: str, result: FilterResult) -> Dict[str, Any]:
+    return {
+        "sentence": sentence,
+        "accepted": result.accepted,
+        "reason": result.reason,
+        "normalized_text": result.normalized_text,
+    }
+
+
+def read_sentences_from_request(body: bytes) -> List[str]:
+    try:
+        request = json.loads(body)
+    except ValueError as err:
+        raise ValueError(f"The request is not valid JSON: {err}")
+
+    sentences = request.get("sentences") if isinstance(request, dict) else None
+    if not isinstance(sentences, list) or not all(
+        isinstance(sentence, str) for sentence in sentences
+    ):
+        raise ValueError('The request must be {"sentences": ["...", ...]}')
+
+    return sentences
+
+
+def read_content_length(header: Optional[str]) -> int:
+    if header is None:
+        return 0
+
+    try:
+        length = int(header)
+    except ValueError:
+        raise ValueError(f"Invalid Content-Length: {header}")
+    if length < 0:
+        raise ValueError(f"Invalid Content-Length: {header}")
+
+    return length
+
+
+class FilterRequestHandler(BaseHTTPRequestHandler):
+    server: Any
+
+    def address_string(self) -> str:
+        # the client of a Unix socket has no address
+        client_address: Any = self.client_address
+        if not client_address:
+            return "unix socket"
+        return str(client_address[0])
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, content: Dict[str, Any]) -> None:
+        body = json.dumps(content, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self.server.metrics.record_error()
+        self._send_json(status, {"error": message})
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            metrics: Dict[str, Any] = self.server.metrics.snapshot()
+            with self.server.filter_lock:
+                metrics["filter"] = dict(self.server.phrase_filter.counters())
+            self._send_json(200, metrics)
+        else:
+            self._send_error(404, f"Unknown path {self.path}")
+
+    def do_POST(self) -> None:
+        if self.path != "/filter":
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+
+        try:
+            length = read_content_length(self.headers.get("Content-Length"))
+        except ValueError as err:
+            self._send_error(400, str(err))
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._send_error(413, f"Requests are limited to {MAX_REQUEST_BYTES} bytes")
+            return
+
+        try:
+            sentences = read_sentences_from_request(self.rfile.read(length))
+        except ValueError as err:
+            self._send_error(400, str(err))
+            return
+
+        start = time.perf_counter()
+        # the filter resources are not thread safe, so one batch is filtered at a time
+        try:
+            with self.server.filter_lock:
+                results = list(self.server.phrase_filter.filter_many(sentences))
+        except Exception as err:
+            logging.exception("Filtering the request failed")
+            self._send_error(500, f"Filtering the request failed: {err}")
+            return
+        self.server.metrics.record_request(time.perf_counter() - start, len(sentences))
+
+        self._send_json(
+            200,
+            {
+                "results": [
+                    result_to_json(sentence, result)
+                    for sentence, result in zip(sentences, results)
+                ]
+            },
+        )
+
+
+class FilterHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Any, phrase_filter: PhraseFilter) -> None:
+        super().__init__(address, FilterRequestHandler)
+        self.phrase_filter = phrase_filter
+        self.filter_lock = threading.Lock()
+        self.metrics = ServerMetrics()
+
+
+class FilterUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, phrase_filter: PhraseFilter) -> None:
+        super().__init__(socket_path, FilterRequestHandler)
+        self.phrase_filter = phrase_filter
+        self.filter_lock = threading.Lock()
+        self.metrics = ServerMetrics()
+
+
+def create_server(
+    phrase_filter: PhraseFilter,
+    host: str = "127.0.0.1",
+    port: int = SERVER_PORT,
+    socket_path: Optional[str] = None,
+) -> Union[FilterHTTPServer, FilterUnixServer]:
+    if socket_path is None:
+        return FilterHTTPServer((host, port), phrase_filter)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    return FilterUnixServer(socket_path, phrase_filter)
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Keeps the filter loaded and filters the sentences posted to it. "
+        "Any other option is passed to the filter, as in filter_phrases.py."
+    )
+    parser.add_argument("--host", dest="host", action="store", default="127.0.0.1")
+    parser.add_argument(
+        "--port", dest="port", action="store", type=int, default=SERVER_PORT
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket",
+        action="store",
+        help="Unix socket to listen on instead of a TCP port",
+    )
+    args, filter_argv = parser.parse_known_args()
+
+    filter_args = parse_filter_options(filter_argv)
+    number_cache_path = (
+        Path(filter_args.number_cache)
+        if filter_args.number_cache and not filter_args.no_number_cache
+        else None
+    )
+    phrase_filter = PhraseFilter(filter_args, number_cache_path)
+    server = create_server(phrase_filter, args.host, args.port, args.socket)
+    logging.info(
+        f"Filtering sentences posted to {args.socket or f'http://{args.host}:{args.port}'}/filter"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        phrase_filter.close()
+        if args.socket:
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
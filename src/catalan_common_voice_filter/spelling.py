@@ -0,0 +1,50 @@
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Any, List
+
+from catalan_common_voice_filter.caches import LRUCache
+
+SPELLING_CACHE_SIZE = 200000
+
+
+class CachedSpellChecker:
+    def __init__(self, dic: Any, cache_size: int = SPELLING_CACHE_SIZE) -> None:
+        self.dic = dic
+        self.cache: LRUCache[str, bool] = LRUCache(cache_size)
+
+    def spell(self, word: str) -> bool:
+        correct = self.cache.get(word)
+        if correct is None:
+            correct = bool(self.dic.spell(word))
+            self.cache.put(word, correct)
+
+        return correct
+
+    def warm_up(self, words: List[str]) -> None:
+        # the least frequent words go in first, so that they are the first to be evicted
+        for word in reversed(words[: self.cache.maxsize]):
+            self.cache.put(word, bool(self.dic.spell(word)))
+
+    def counters(self) -> "Counter[str]":
+        counters: "Counter[str]" = Counter()
+        counters["spelling cache hits"] = self.cache.hits
+        counters["spelling cache misses"] = self.cache.misses
+        return counters
+
+
+def read_word_frequency_list(path: Path, limit: int) -> List[str]:
+    # one word per line, most frequent first, optionally followed by a tab and its count
+    with open(path, "r") as f:
+        return [
+            line.split("\t")[0].strip() for line in islice(f, limit) if line.strip()
+        ]
+
+
+def describe_spelling(counters: "Counter[str]") -> List[str]:
+    lookups = counters["spelling cache hits"] + counters["spelling cache misses"]
+    hit_rate = counters["spelling cache hits"] * 100 / lookups if lookups else 0.0
+    return [
+        f"Spelling cache: {counters['spelling cache hits']} hits, "
+        f"{counters['spelling cache misses']} misses ({round(hit_rate, 2)}%)"
+    ]
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+from catalan_common_voice_filter.caches import PersistentStore
+from catalan_common_voice_filter.dedup import hash_sentence
+
+VERDICT_STORE_TABLE = "verdicts"
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def create_fingerprint(
+    settings: Iterable[str], files: Iterable[Union[str, Path]]
+) -> str:
+    # files are fingerprinted by their content, so moving them does not change it
+    digest = hashlib.blake2b(digest_size=16)
+    for setting in settings:
+        digest.update(setting.encode() + b"\0")
+    for path in files:
+        digest.update(hash_file(path).encode() + b"\0")
+
+    return digest.hexdigest()
+
+
+class VerdictStore:
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        # the verdicts of every configuration are kept, so that going back to a previous
+        # one reuses them as well
+        self.fingerprint = fingerprint
+        self.store = PersistentStore(path, VERDICT_STORE_TABLE)
+
+    def _key(self, sentence: str) -> str:
+        return f"{self.fingerprint}:{hash_sentence(sentence).hex()}"
+
+    def get(self, sentence: str) -> Optional[List[Any]]:
+        value = self.store.get(self._key(sentence))
+        if value is None:
+            return None
+
+        verdict: List[Any] = json.loads(value)
+        return verdict
+
+    def put(self, sentence: str, verdict: Sequence[Any]) -> None:
+        self.store.put(self._key(sentence), json.dumps(verdict, ensure_ascii=False))
+
+    def counters(self) -> "Counter[str]":
+        counters: "Counter[str]" = Counter()
+        counters["verdict store hits"] = self.store.hits
+        counters["verdict store misses"] = self.store.misses
+        return counters
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def describe_verdict_store(counters: "Counter[str]") -> List[str]:
+    if "verdict store hits" not in counters:
+        return []
+
+    return [
+        f"Verdict store: {counters['verdict store hits']} verdicts reused, "
+        f"{counters['verdict store misses']} sentences filtered"
+    ]
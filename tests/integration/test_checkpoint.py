@@ -0,0 +1,156 @@
+# mypy: ignore-errors
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+from catalan_common_voice_filter import filter_phrases
+from catalan_common_voice_filter.checkpoint import CHECKPOINT_FILE_NAME, read_checkpoint
+
+TESTS_DIR = Path(__file__).parent.parent
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def files_to_filter(tmp_path):
+    # a compressed file in the middle, so that resuming seeks into a decompressed stream
+    compressed_file = tmp_path / "pujolar_twain.txt.gz"
+    with open(TESTS_DIR / "data/pujolar_twain.txt", "rb") as f:
+        compressed_file.write_bytes(gzip.compress(f.read()))
+
+    return [
+        str(TESTS_DIR / "data/frases_prova.txt"),
+        str(compressed_file),
+        str(TESTS_DIR / "data/numeros_prova.txt"),
+    ]
+
+
+def run_filter(monkeypatch, files_to_filter, output_dir, *options):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["filter_phrases.py", "-f", *files_to_filter, "-d", str(output_dir)]
+        + ["-pn", "--no-number-cache", *options],
+    )
+    filter_phrases.main()
+
+
+def interrupt_after(monkeypatch, verdicts):
+    add_verdict_to_results = filter_phrases.add_verdict_to_results
+    added = 0
+
+    def add_verdict_or_interrupt(*args):
+        nonlocal added
+        if added == verdicts:
+            raise Interrupted()
+        added += 1
+        add_verdict_to_results(*args)
+
+    monkeypatch.setattr(
+        filter_phrases, "add_verdict_to_results", add_verdict_or_interrupt
+    )
+
+
+def read_output_files(output_dir):
+    # the cache statistics only cover the sentences filtered after resuming
+    return {
+        path.name: [
+            line
+            for line in path.read_text().splitlines()
+            if "cache" not in line and "Lexicon" not in line
+        ]
+        for path in output_dir.iterdir()
+    }
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_resumed_run_matches_uninterrupted_run(
+    monkeypatch, tmp_path, files_to_filter, workers
+):
+    run_filter(
+        monkeypatch,
+        files_to_filter,
+        tmp_path / "uninterrupted",
+        "--stream",
+        "--dedup-index",
+        str(tmp_path / "uninterrupted.index"),
+        "-w",
+        workers,
+    )
+
+    options = ["--dedup-index", str(tmp_path / "resumed.index"), "-w", workers]
+    with monkeypatch.context() as context:
+        interrupt_after(context, 150)
+        with pytest.raises(Interrupted):
+            run_filter(
+                context,
+                files_to_filter,
+                tmp_path / "resumed",
+                "--checkpoint-every",
+                "100",
+                *options,
+            )
+    checkpoint = read_checkpoint(tmp_path / "resumed")
+    assert checkpoint.position.file == 1
+    assert 100 <= checkpoint.filtered <= 150
+
+    with monkeypatch.context() as context:
+        interrupt_after(context, 150)
+        with pytest.raises(Interrupted):
+            run_filter(
+                context, files_to_filter, tmp_path / "resumed", "--resume", *options
+            )
+    assert read_checkpoint(tmp_path / "resumed").filtered > checkpoint.filtered
+
+    run_filter(monkeypatch, files_to_filter, tmp_path / "resumed", "--resume", *options)
+
+    assert not (tmp_path / "resumed" / CHECKPOINT_FILE_NAME).exists()
+    assert read_output_files(tmp_path / "resumed") == read_output_files(
+        tmp_path / "uninterrupted"
+    )
+    assert (tmp_path / "resumed.index").read_bytes() == (
+        tmp_path / "uninterrupted.index"
+    ).read_bytes()
+
+
+def test_resume_checks_the_files_of_the_checkpoint(
+    monkeypatch, tmp_path, files_to_filter
+):
+    with monkeypatch.context() as context:
+        interrupt_after(context, 200)
+        with pytest.raises(Interrupted):
+            run_filter(context, files_to_filter, tmp_path, "--checkpoint-every", "100")
+
+    with pytest.raises(SystemExit):
+        run_filter(monkeypatch, files_to_filter[:2], tmp_path, "--resume")
+
+
+def test_resume_checks_the_filter_options_of_the_checkpoint(
+    monkeypatch, tmp_path, files_to_filter
+):
+    with monkeypatch.context() as context:
+        interrupt_after(context, 200)
+        with pytest.raises(Interrupted):
+            run_filter(context, files_to_filter, tmp_path, "--checkpoint-every", "100")
+    checkpoint = (tmp_path / CHECKPOINT_FILE_NAME).read_text()
+
+    with pytest.raises(SystemExit):
+        run_filter(monkeypatch, files_to_filter, tmp_path, "--resume", "-v")
+    assert (tmp_path / CHECKPOINT_FILE_NAME).read_text() == checkpoint
+
+
+@pytest.mark.parametrize("checkpoint", [None, "", '{"files": []', '{"files": []}'])
+def test_resume_without_a_readable_checkpoint(
+    monkeypatch, tmp_path, files_to_filter, checkpoint, capsys
+):
+    if checkpoint is not None:
+        (tmp_path / CHECKPOINT_FILE_NAME).write_text(checkpoint)
+
+    with pytest.raises(SystemExit):
+        run_filter(monkeypatch, files_to_filter, tmp_path, "--resume")
+
+    assert "checkpoint" in capsys.readouterr().err
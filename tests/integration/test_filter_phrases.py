@@ -1,9 +1,12 @@
 # mypy: ignore-errors
+import sys
 from pathlib import Path
 
 import pytest
 
+from catalan_common_voice_filter import filter_phrases
 from catalan_common_voice_filter.filter_phrases import (
+    create_excluded_phrase_automaton,
     create_excluded_words_list,
     split_filter_file_into_sentences,
 )
@@ -29,7 +32,37 @@ def test_create_excluded_words_list_no_file():
     assert len(excluded_words) == 0
 
 
+def test_create_excluded_words_list_with_casefold(tmp_path):
+    words_file = tmp_path / "words.txt"
+    words_file.write_text("Paraula\nmal parit\n\nCAP\n")
+
+    assert create_excluded_words_list(str(words_file)) == {"Paraula", "CAP"}
+    assert create_excluded_words_list(str(words_file), True) == {"paraula", "cap"}
+
+
+def test_create_excluded_phrase_automaton(tmp_path):
+    words_file = tmp_path / "words.txt"
+    words_file.write_text("paraula\nMal parit\n")
+
+    automaton = create_excluded_phrase_automaton(str(words_file), True)
+
+    assert automaton.phrases == ["Mal parit"]
+    assert automaton.find("Era un mal parit.") == "Mal parit"
+    assert create_excluded_phrase_automaton(None) is None
+
+
 def test_split_filter_file_into_sentences(file_to_filter):
     sentences, total_lines = split_filter_file_into_sentences(file_to_filter)
     assert len(sentences) > 0
     assert total_lines == 25
+
+
+def test_main_reports_a_glob_without_files(monkeypatch, tmp_path, capsys):
+    pattern = str(tmp_path / "*.txt")
+    monkeypatch.setattr(sys, "argv", ["filter_phrases.py", "-f", pattern])
+
+    with pytest.raises(SystemExit):
+        filter_phrases.main()
+
+    assert f"No files match {pattern}" in capsys.readouterr().err
+    assert list(tmp_path.iterdir()) == []
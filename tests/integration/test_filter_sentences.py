@@ -0,0 +1,218 @@
+# mypy: ignore-errors
+import gzip
+from argparse import ArgumentParser
+from collections import Counter, deque
+from pathlib import Path
+
+import lingua_franca
+import pytest
+
+from catalan_common_voice_filter import filter_phrases
+from catalan_common_voice_filter.dedup import DeduplicationIndex
+from catalan_common_voice_filter.filter_phrases import (
+    CASE_STUDY_FILES,
+    OUTPUT_FILES,
+    add_args,
+    add_verdict_to_results,
+    count_selected_phrases_by_source,
+    create_category_files,
+    filter_chunk,
+    filter_sentence,
+    filter_sentences,
+    filter_sentences_in_workers,
+    get_surname_list,
+    load_filter_resources,
+    load_spacy_tokenizer,
+    read_sentences,
+    split_filter_file_into_sentences,
+)
+from catalan_common_voice_filter.output import sort_file
+from catalan_common_voice_filter.records import SentenceSource
+
+TESTS_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def sentences():
+    sentences, _ = split_filter_file_into_sentences(TESTS_DIR / "data/frases_prova.txt")
+    return sentences
+
+
+@pytest.fixture
+def args():
+    parser = ArgumentParser()
+    add_args(parser)
+    return parser.parse_args(
+        ["-f", "frases_prova.txt", "--no-number-cache", "--chunk-size", "4", "-pn"]
+    )
+
+
+@pytest.fixture(autouse=True)
+def language():
+    lingua_franca.load_language("en")
+
+
+def test_filter_sentences_in_workers_matches_single_process(sentences, args):
+    resources = load_filter_resources(args, None)
+    expected = list(filter_sentences(sentences, args, resources))
+
+    args.workers = 2
+    counters = Counter()
+    result = list(filter_sentences_in_workers(sentences, args, None, counters))
+
+    assert result == expected
+    assert len(result) == len(sentences)
+    assert "cache misses" in counters
+
+
+def test_filter_chunk_matches_filtering_sentences_one_by_one(sentences, args):
+    resources = load_filter_resources(args, None)
+    expected = [filter_sentence(line, args, resources) for line in sentences]
+
+    args.spacy_batch_size = 3
+    result = filter_chunk(sentences, args, resources)
+
+    assert result == expected
+
+
+def test_load_spacy_tokenizer_without_verb_only_tokenizes():
+    tagger = load_spacy_tokenizer(True)
+    tokenizer = load_spacy_tokenizer(False)
+    text = "Bon dia tingui, Sr. Felip, a les 3h."
+
+    assert tokenizer.pipe_names == []
+    assert [token.text for token in tokenizer(text)] == [
+        token.text for token in tagger(text)
+    ]
+
+
+def test_get_surname_list():
+    surnames = get_surname_list()
+
+    assert isinstance(surnames, frozenset)
+    assert "Garcia" in surnames
+    assert all(len(surname) >= 3 for surname in surnames)
+
+
+def test_read_sentences_counts_lines_and_sentences_of_every_file(sentences, tmp_path):
+    file_to_filter = TESTS_DIR / "data/frases_prova.txt"
+    compressed_file = tmp_path / "frases_prova.txt.gz"
+    with gzip.open(compressed_file, "wb") as f:
+        f.write(file_to_filter.read_bytes())
+
+    source_counts = []
+    result = list(read_sentences([file_to_filter, compressed_file], source_counts))
+
+    assert result == sentences + sentences
+    assert [source for source, _ in source_counts] == [
+        str(file_to_filter),
+        str(compressed_file),
+    ]
+    for _, counts in source_counts:
+        assert counts["sentences"] == len(sentences)
+        assert counts["lines"] == 25
+
+
+def test_read_sentences_adds_the_source_of_every_sentence(tmp_path):
+    file_to_filter = tmp_path / "frases.txt"
+    file_to_filter.write_text("És aquí. Com estàs?\nMolt bé.\n", encoding="utf-8")
+
+    sources = deque()
+    result = list(read_sentences([file_to_filter], [], sources=sources))
+
+    assert result == ["És aquí.", "Com estàs?", "Molt bé."]
+    # the offsets are in bytes, and É and à take two
+    assert list(sources) == [
+        SentenceSource(str(file_to_filter), 1, 0),
+        SentenceSource(str(file_to_filter), 1, 11),
+        SentenceSource(str(file_to_filter), 2, 23),
+    ]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_read_sentences_sources_point_to_the_sentences(sentences, tmp_path, compress):
+    file_to_filter = TESTS_DIR / "data/frases_prova.txt"
+    data = file_to_filter.read_bytes()
+    if compress:
+        file_to_filter = tmp_path / "frases_prova.txt.gz"
+        with gzip.open(file_to_filter, "wb") as f:
+            f.write(data)
+
+    sources = deque()
+    result = list(read_sentences([file_to_filter], [], sources=sources))
+
+    assert result == sentences
+    assert len(sources) == len(result)
+    for sentence, source in zip(result, sources):
+        assert data[source.offset :].decode().startswith(sentence)
+        assert data.count(b"\n", 0, source.offset) == source.line - 1
+
+
+def test_read_sentences_with_split_workers_matches_single_process(monkeypatch):
+    # small chunks, so the lines are split by several workers
+    monkeypatch.setattr(filter_phrases, "SPLIT_CHUNK_LINES", 7)
+    files_to_filter = [
+        TESTS_DIR / "data/frases_prova.txt",
+        TESTS_DIR / "data/pujolar_twain.txt",
+    ]
+    expected_counts = []
+    expected_positions = deque()
+    expected = list(
+        read_sentences(files_to_filter, expected_counts, positions=expected_positions)
+    )
+
+    source_counts = []
+    positions = deque()
+    result = list(
+        read_sentences(
+            files_to_filter, source_counts, positions=positions, split_workers=2
+        )
+    )
+
+    assert result == expected
+    assert source_counts == expected_counts
+    assert positions == expected_positions
+
+
+def test_count_selected_phrases_by_source(sentences, args):
+    resources = load_filter_resources(args, None)
+    source_counts = []
+    files_to_filter = [TESTS_DIR / "data/frases_prova.txt"] * 2
+    verdicts = filter_sentences(
+        read_sentences(files_to_filter, source_counts), args, resources
+    )
+
+    result = list(count_selected_phrases_by_source(verdicts, source_counts))
+
+    selected = sum(verdict.selected_phrase is not None for verdict in result)
+    assert selected > 0
+    assert [counts["selected"] for _, counts in source_counts] == [
+        selected / 2,
+        selected / 2,
+    ]
+
+
+def test_streamed_results_match_results_in_memory(sentences, args, tmp_path):
+    resources = load_filter_resources(args, None)
+    verdicts = list(filter_sentences(sentences, args, resources))
+    results = {category: [] for category in OUTPUT_FILES}
+    case_studies = {name: [] for name in CASE_STUDY_FILES}
+    selected_index = DeduplicationIndex()
+    for verdict in verdicts:
+        add_verdict_to_results(verdict, results, case_studies, selected_index)
+
+    category_files, case_study_files = create_category_files(tmp_path, "frases")
+    selected_index = DeduplicationIndex()
+    for verdict in verdicts:
+        add_verdict_to_results(
+            verdict, category_files, case_study_files, selected_index
+        )
+
+    for category, category_file in category_files.items():
+        category_file.close()
+        sort_file(category_file.path, 2)
+        assert len(category_file) == len(results[category])
+        assert category_file.path.read_text().splitlines() == sorted(results[category])
+    for name, case_study_file in case_study_files.items():
+        case_study_file.close()
+        assert len(case_study_file) == len(case_studies[name])
@@ -0,0 +1,45 @@
+# mypy: ignore-errors
+from pathlib import Path
+
+import pytest
+
+from catalan_common_voice_filter.lexicon import (
+    expand_word,
+    read_affix_file,
+    read_dictionary_file,
+    split_flags,
+)
+
+DATA_DIR = Path(__file__).parent.parent.parent / "src/catalan_common_voice_filter/data"
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return read_affix_file(DATA_DIR / "ca.aff")
+
+
+@pytest.fixture(scope="module")
+def dictionary():
+    return dict(read_dictionary_file(DATA_DIR / "ca.dic"))
+
+
+def test_read_affix_file_with_catalan_dictionary(rules):
+    assert rules.flag_type == "long"
+    assert rules.forbidden_flag == "ZZ"
+    assert "_V" in rules.prefixes
+    assert "00" in rules.suffixes
+
+
+@pytest.mark.parametrize(
+    "word,expected_forms",
+    [
+        ("cantar", ["cantar", "canto", "cantàvem", "cantaríeu", "cantéssim"]),
+        ("casa", ["casa", "cases"]),
+        ("home", ["home", "l'home", "d'home"]),
+    ],
+)
+def test_expand_word_with_catalan_dictionary(rules, dictionary, word, expected_forms):
+    forms = expand_word(word, split_flags(dictionary[word], rules.flag_type), rules)
+
+    for form in expected_forms:
+        assert form in forms
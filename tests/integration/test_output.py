@@ -0,0 +1,61 @@
+# mypy: ignore-errors
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+from catalan_common_voice_filter import filter_phrases
+
+TESTS_DIR = Path(__file__).parent.parent
+
+
+def run_filter(monkeypatch, output_dir, *options):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "filter_phrases.py",
+            "-f",
+            str(TESTS_DIR / "data/frases_prova.txt"),
+            "-d",
+            str(output_dir),
+            "-pn",
+            "--no-number-cache",
+            *options,
+        ],
+    )
+    filter_phrases.main()
+
+
+def read_results_files(output_dir):
+    results = {}
+    for path in output_dir.iterdir():
+        if path.name.endswith("_filter_statistics.txt"):
+            continue
+        if path.suffix == ".gz":
+            results[path.stem] = gzip.decompress(path.read_bytes()).decode()
+        else:
+            results[path.name] = path.read_text()
+    return results
+
+
+@pytest.mark.parametrize("options", [[], ["--stream"], ["--stream", "--no-sort"]])
+def test_compressed_results_match_uncompressed_results(monkeypatch, tmp_path, options):
+    run_filter(monkeypatch, tmp_path / "plain", *options)
+    run_filter(
+        monkeypatch,
+        tmp_path / "compressed",
+        "--compress-output",
+        "gz",
+        "--write-threads",
+        "4",
+        *options,
+    )
+
+    expected = read_results_files(tmp_path / "plain")
+    assert all(
+        path.name.endswith(".gz") or path.name.endswith("_filter_statistics.txt")
+        for path in (tmp_path / "compressed").iterdir()
+    )
+    assert read_results_files(tmp_path / "compressed") == expected
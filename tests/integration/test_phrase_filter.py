@@ -0,0 +1,96 @@
+# mypy: ignore-errors
+from pathlib import Path
+
+import pytest
+
+from catalan_common_voice_filter.filter_phrases import (
+    FilterResult,
+    PhraseFilter,
+    split_filter_file_into_sentences,
+)
+
+TESTS_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="module")
+def phrase_filter():
+    with PhraseFilter(proper_nouns=True, chunk_size=4) as phrase_filter:
+        yield phrase_filter
+
+
+@pytest.fixture
+def sentences():
+    sentences, _ = split_filter_file_into_sentences(TESTS_DIR / "data/frases_prova.txt")
+    return sentences
+
+
+def test_phrase_filter_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with PhraseFilter() as phrase_filter:
+        result = phrase_filter.filter("El meu germà té 3 gats i 2 gossos.")
+
+    assert result == FilterResult(True, None, "El meu germà té tres gats i dos gossos.")
+
+
+@pytest.mark.parametrize(
+    "sentence,expected",
+    [
+        ("Hola", FilterResult(False, "excluded_sentences_improper_length", None)),
+        (
+            "La reunió serà a les 11:30 al despatx.",
+            FilterResult(False, "excluded_hours", None),
+        ),
+        ("Ahir vaig veure la Maria Puig.", FilterResult(False, "excluded_names", None)),
+        (
+            "la nena estava molt contenta",
+            FilterResult(True, None, "La nena estava molt contenta."),
+        ),
+    ],
+)
+def test_phrase_filter_filter(phrase_filter, sentence, expected):
+    assert phrase_filter.filter(sentence) == expected
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    ["El Sr. Puig fa sempre el que vol.", "Ho ha dit el Dr Puig i ell també ho ha."],
+)
+def test_phrase_filter_does_not_replace_words_before_the_final_period(sentence):
+    with PhraseFilter(no_number_cache=True) as phrase_filter:
+        result = phrase_filter.filter(sentence)
+
+    assert result == FilterResult(
+        True, None, sentence.replace("Sr.", "senyor").replace("Dr", "doctor")
+    )
+
+
+def test_phrase_filter_filter_many_matches_filter(phrase_filter, sentences):
+    expected = [phrase_filter.filter(sentence) for sentence in sentences]
+
+    result = phrase_filter.filter_many(iter(sentences))
+
+    assert list(result) == expected
+    assert any(result.accepted for result in expected)
+    assert phrase_filter.counters()["spelling cache misses"] > 0
+
+
+def test_phrase_filter_with_unknown_option():
+    with pytest.raises(ValueError):
+        PhraseFilter(unknown_option=True)
+
+
+def test_phrase_filter_with_excluded_words_list(tmp_path):
+    words_file = tmp_path / "words.txt"
+    words_file.write_text("Nena\nmolt contenta\n")
+
+    with PhraseFilter(list=str(words_file), list_casefold=True) as phrase_filter:
+        assert phrase_filter.filter("la nena estava feliç") == FilterResult(
+            False, "excluded_words", None
+        )
+        assert phrase_filter.filter("El nen estava molt contenta.") == FilterResult(
+            False, "excluded_words", None
+        )
+        assert phrase_filter.filter("El nen estava molt content.") == FilterResult(
+            True, None, "El nen estava molt content."
+        )
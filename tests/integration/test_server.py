@@ -0,0 +1,148 @@
+# mypy: ignore-errors
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from catalan_common_voice_filter.filter_phrases import PhraseFilter
+from catalan_common_voice_filter.server import create_server
+
+
+@pytest.fixture(scope="module")
+def phrase_filter():
+    with PhraseFilter() as phrase_filter:
+        yield phrase_filter
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def server(phrase_filter):
+    server = create_server(phrase_filter, port=0)
+    thread = serve(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    content = json.loads(response.read())
+    connection.close()
+    return response.status, content
+
+
+def test_server_filters_the_posted_sentences(server):
+    body = json.dumps({"sentences": ["Hola", "El meu germà té 3 gats i 2 gossos."]})
+
+    status, content = request(server, "POST", "/filter", body)
+
+    assert status == 200
+    assert content["results"] == [
+        {
+            "sentence": "Hola",
+            "accepted": False,
+            "reason": "excluded_sentences_improper_length",
+            "normalized_text": None,
+        },
+        {
+            "sentence": "El meu germà té 3 gats i 2 gossos.",
+            "accepted": True,
+            "reason": None,
+            "normalized_text": "El meu germà té tres gats i dos gossos.",
+        },
+    ]
+
+
+def test_server_reports_metrics(server):
+    body = json.dumps({"sentences": ["Bon dia a tothom.", "Hola"]})
+    request(server, "POST", "/filter", body)
+    request(server, "POST", "/filter", "not json")
+
+    status, metrics = request(server, "GET", "/metrics")
+
+    assert status == 200
+    assert metrics["requests"] == 1
+    assert metrics["sentences"] == 2
+    assert metrics["errors"] == 1
+    assert metrics["sentences_per_second"] > 0
+    assert "spelling cache hits" in metrics["filter"]
+
+
+@pytest.mark.parametrize(
+    "method,path,body,expected_status",
+    [
+        ("POST", "/filter", "not json", 400),
+        ("POST", "/filter", '{"sentences": "Hola"}', 400),
+        ("POST", "/unknown", "{}", 404),
+        ("GET", "/unknown", None, 404),
+    ],
+)
+def test_server_rejects_bad_requests(server, method, path, body, expected_status):
+    status, content = request(server, method, path, body)
+
+    assert status == expected_status
+    assert "error" in content
+
+
+@pytest.mark.parametrize("content_length", [b"dotze", b"-1"])
+def test_server_rejects_invalid_content_lengths(server, content_length):
+    with socket.create_connection(server.server_address) as client:
+        client.sendall(
+            b"POST /filter HTTP/1.0\r\nContent-Length: " + content_length + b"\r\n\r\n"
+        )
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+
+    headers, _, content = response.partition(b"\r\n\r\n")
+    assert headers.startswith(b"HTTP/1.0 400")
+    assert "error" in json.loads(content)
+
+
+def test_server_reports_filtering_errors(server, monkeypatch):
+    def fail(sentences):
+        raise RuntimeError("apertium has stopped")
+
+    monkeypatch.setattr(server.phrase_filter, "filter_many", fail)
+
+    status, content = request(server, "POST", "/filter", '{"sentences": ["Hola"]}')
+
+    assert status == 500
+    assert "apertium has stopped" in content["error"]
+    assert server.metrics.snapshot()["errors"] == 1
+
+
+def test_server_listens_on_a_unix_socket(phrase_filter, tmp_path):
+    socket_path = str(tmp_path / "filter.sock")
+    server = create_server(phrase_filter, socket_path=socket_path)
+    thread = serve(server)
+
+    body = json.dumps({"sentences": ["Hola"]}).encode()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(
+            b"POST /filter HTTP/1.0\r\nContent-Length: "
+            + str(len(body)).encode()
+            + b"\r\n\r\n"
+            + body
+        )
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+    headers, _, content = response.partition(b"\r\n\r\n")
+    assert headers.startswith(b"HTTP/1.0 200")
+    assert json.loads(content)["results"][0]["accepted"] is False
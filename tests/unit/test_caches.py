@@ -0,0 +1,79 @@
+# mypy: ignore-errors
+import sqlite3
+
+from catalan_common_voice_filter.caches import LRUCache, PersistentStore
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache(10)
+    cache.put("un", 1)
+
+    assert cache.get("un") == 1
+    assert cache.get("dos") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate() == 0.5
+
+
+def test_lru_cache_evicts_least_recently_used_entry():
+    cache = LRUCache(2)
+    cache.put("un", 1)
+    cache.put("dos", 2)
+    cache.get("un")
+    cache.put("tres", 3)
+
+    assert len(cache) == 2
+    assert "un" in cache
+    assert "dos" not in cache
+    assert "tres" in cache
+
+
+def test_persistent_store_survives_reopening(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = PersistentStore(path, "entries")
+    store.put("1872", "divuit setanta dos")
+    store.close()
+
+    store = PersistentStore(path, "entries")
+    assert "1872" in store
+    assert store.get("1872") == "divuit setanta dos"
+    assert store.get("1567") is None
+    assert store.hits == 1
+    assert store.misses == 1
+    store.close()
+
+
+def test_persistent_store_is_read_while_another_process_writes(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = PersistentStore(path, "entries")
+    store.put("1872", "divuit setanta dos")
+    store.commit()
+
+    writer = sqlite3.connect(path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO entries (key, value) VALUES ('3', 'tres')")
+
+    assert store.get("1872") == "divuit setanta dos"
+    writer.rollback()
+    writer.close()
+    store.close()
+
+
+def test_persistent_store_skips_writes_while_locked(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = PersistentStore(path, "entries", timeout=0.1)
+    writer = sqlite3.connect(path)
+    writer.execute("BEGIN IMMEDIATE")
+
+    store.put("1872", "divuit setanta dos")
+    assert store.get("1872") == "divuit setanta dos"
+    store.commit()
+
+    assert store.skipped_writes == 1
+    assert store.get("1872") is None
+
+    writer.rollback()
+    writer.close()
+    store.put("1567", "quinze seixanta set")
+    store.close()
+    assert PersistentStore(path, "entries").get("1567") == "quinze seixanta set"
@@ -0,0 +1,91 @@
+# mypy: ignore-errors
+from collections import Counter, deque
+
+import pytest
+
+from catalan_common_voice_filter.checkpoint import (
+    CHECKPOINT_FILE_NAME,
+    DEDUP_CHECKPOINT_FILE_NAME,
+    Checkpointer,
+    InputPosition,
+    read_checkpoint,
+    remove_checkpoint,
+)
+from catalan_common_voice_filter.dedup import DIGEST_SIZE, DeduplicationIndex
+from catalan_common_voice_filter.output import CaseStudyFile, CategoryFile
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    results = {"selected_phrases": CategoryFile(tmp_path / "selected.txt")}
+    case_studies = {"case_studies": CaseStudyFile(tmp_path / "case_studies.tsv")}
+    source_counts = [
+        ("a.txt", Counter(lines=1, sentences=2, selected=1)),
+        ("b.txt", Counter(lines=3, sentences=4)),
+    ]
+    checkpointer = Checkpointer(
+        tmp_path,
+        2,
+        ["a.txt", "b.txt"],
+        "fingerprint",
+        deque(),
+        source_counts,
+        results,
+        case_studies,
+        DeduplicationIndex(),
+    )
+    yield checkpointer
+    results["selected_phrases"].close()
+    case_studies["case_studies"].close()
+
+
+def test_checkpointer_only_checkpoints_after_a_whole_line(checkpointer, tmp_path):
+    # a line of two sentences in the first file, and lines of one, two and one
+    # sentences in the second
+    checkpointer.positions.extend(
+        [
+            InputPosition(0, 10, 1, 2, 2),
+            InputPosition(1, 5, 1, 1, 3),
+            InputPosition(1, 12, 2, 3, 5),
+            InputPosition(1, 20, 3, 4, 6),
+        ]
+    )
+    checkpointer.results["selected_phrases"].append("Frase original.")
+    checkpointer.selected_index.add("Frase original.")
+
+    checkpointer.add()
+    assert not (tmp_path / CHECKPOINT_FILE_NAME).exists()
+
+    checkpointer.add()
+    checkpoint = read_checkpoint(tmp_path)
+    assert checkpoint.filtered == 2
+    assert checkpoint.position == InputPosition(0, 10, 1, 2, 2)
+    assert checkpoint.source_counts == [
+        ("a.txt", Counter(lines=1, sentences=2, selected=1))
+    ]
+    assert checkpoint.results == {"selected_phrases": (16, 1)}
+    assert checkpoint.case_studies == {"case_studies": (0, 0)}
+    assert checkpoint.dedup_size == DIGEST_SIZE
+
+    # the fourth sentence is in the middle of a line
+    checkpointer.add()
+    checkpointer.add()
+    assert read_checkpoint(tmp_path).filtered == 2
+
+    checkpointer.add()
+    checkpoint = read_checkpoint(tmp_path)
+    assert checkpoint.filtered == 5
+    assert checkpoint.position == InputPosition(1, 12, 2, 3, 5)
+    assert checkpoint.source_counts[1] == ("b.txt", Counter(lines=2, sentences=3))
+
+
+def test_remove_checkpoint(checkpointer, tmp_path):
+    checkpointer.positions.append(InputPosition(0, 10, 1, 2, 2))
+    checkpointer.add()
+    checkpointer.add()
+    assert (tmp_path / CHECKPOINT_FILE_NAME).exists()
+
+    remove_checkpoint(tmp_path)
+
+    assert not (tmp_path / CHECKPOINT_FILE_NAME).exists()
+    assert not (tmp_path / DEDUP_CHECKPOINT_FILE_NAME).exists()
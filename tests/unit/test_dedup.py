@@ -0,0 +1,71 @@
+# mypy: ignore-errors
+from catalan_common_voice_filter.dedup import (
+    DIGEST_SIZE,
+    DeduplicationIndex,
+    hash_sentence,
+)
+
+
+def test_hash_sentence():
+    digest = hash_sentence("Bon dia tingui, senyor Felip.")
+
+    assert len(digest) == DIGEST_SIZE
+    assert digest == hash_sentence("Bon dia tingui, senyor Felip.")
+    assert digest != hash_sentence("Bon dia tingui, doctora Maria.")
+
+
+def test_deduplication_index_add():
+    index = DeduplicationIndex()
+
+    assert index.add("Frase original.")
+    assert not index.add("Frase original.")
+    assert index.add("Una altra frase.")
+    assert len(index) == 2
+    assert index.previous_runs_hits == 0
+
+
+def test_deduplication_index_is_shared_between_runs(tmp_path):
+    path = tmp_path / "selected.idx"
+    index = DeduplicationIndex(path)
+    index.add("Frase original.")
+    index.save()
+
+    index = DeduplicationIndex(path)
+    assert not index.add("Frase original.")
+    assert index.add("Una altra frase.")
+    assert index.previous_runs_hits == 1
+    index.save()
+
+    assert path.stat().st_size == 2 * DIGEST_SIZE
+
+
+def test_deduplication_index_without_file_is_not_saved(tmp_path):
+    index = DeduplicationIndex()
+    index.add("Frase original.")
+    index.save()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_deduplication_index_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "selected.idx"
+    checkpoint_path = tmp_path / "checkpoint.dedup"
+    index = DeduplicationIndex(path)
+    index.add("Frase original.")
+    assert index.write_checkpoint(checkpoint_path) == DIGEST_SIZE
+    index.add("Una altra frase.")
+    size = index.write_checkpoint(checkpoint_path)
+    index.add("Frase perduda.")
+
+    index = DeduplicationIndex(path)
+    index.resume(checkpoint_path, size, previous_runs_hits=3)
+    assert not index.add("Frase original.")
+    assert not index.add("Una altra frase.")
+    assert index.add("Frase perduda.")
+    assert index.previous_runs_hits == 3
+    index.save()
+
+    assert path.read_bytes() == b"".join(
+        hash_sentence(sentence)
+        for sentence in ["Frase original.", "Una altra frase.", "Frase perduda."]
+    )
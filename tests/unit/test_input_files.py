@@ -0,0 +1,180 @@
+# mypy: ignore-errors
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+import pytest
+
+from catalan_common_voice_filter import input_files
+from catalan_common_voice_filter.input_files import (
+    expand_input_paths,
+    get_input_name,
+    is_mapped_input,
+    open_input,
+    read_input_lines,
+    read_mapped_lines,
+)
+
+TEXT = "Bon dia tingui, senyor Felip.\nVa venir la Maria.\n"
+
+
+@pytest.mark.parametrize(
+    "name,compress",
+    [
+        ("frases.txt", lambda data: data),
+        ("frases.txt.gz", gzip.compress),
+        ("frases.txt.bz2", bz2.compress),
+        ("frases.txt.xz", lzma.compress),
+    ],
+)
+def test_open_input_decompresses_files(tmp_path, name, compress):
+    path = tmp_path / name
+    path.write_bytes(compress(TEXT.encode()))
+
+    with open_input(path) as f:
+        assert f.read() == TEXT
+
+
+def test_open_input_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(input_files, "zstandard", None)
+
+    with pytest.raises(IOError):
+        open_input(tmp_path / "frases.txt.zst")
+
+
+def test_open_input_reads_stdin(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO(TEXT))
+
+    with open_input("-") as f:
+        assert f.read() == TEXT
+
+
+def test_expand_input_paths(tmp_path):
+    for name in ["b.txt.gz", "a.txt", "c.csv"]:
+        (tmp_path / name).write_text(TEXT)
+
+    result = expand_input_paths([str(tmp_path / "*.txt*"), "-", "other.txt"])
+
+    assert result == [
+        str(tmp_path / "a.txt"),
+        str(tmp_path / "b.txt.gz"),
+        "-",
+        "other.txt",
+    ]
+
+
+def test_expand_input_paths_without_matches(tmp_path):
+    with pytest.raises(IOError):
+        expand_input_paths([str(tmp_path / "*.txt")])
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("path/to/frases.txt", "frases"),
+        ("path/to/frases.txt.gz", "frases"),
+        ("frases.zst", "frases"),
+        ("-", "stdin"),
+    ],
+)
+def test_get_input_name(path, expected):
+    assert get_input_name(path) == expected
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [("frases.txt", True), ("frases", True), ("frases.txt.gz", False)],
+)
+def test_is_mapped_input(tmp_path, name, expected):
+    path = tmp_path / name
+    path.write_text(TEXT)
+
+    assert is_mapped_input(path) == expected
+
+
+def test_is_mapped_input_without_a_regular_file(tmp_path):
+    (tmp_path / "buida.txt").write_text("")
+    os.mkfifo(tmp_path / "fifo")
+
+    assert not is_mapped_input("-")
+    assert not is_mapped_input(tmp_path / "buida.txt")
+    assert not is_mapped_input(tmp_path / "fifo")
+    assert not is_mapped_input(tmp_path / "no_existeix.txt")
+
+
+def test_read_input_lines_from_a_pipe():
+    # what -f <(zcat frases.txt.gz) passes as the input file
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, TEXT.encode())
+    os.close(write_fd)
+
+    try:
+        lines = list(read_input_lines(f"/dev/fd/{read_fd}", offsets=True))
+    finally:
+        os.close(read_fd)
+
+    assert lines == [
+        ("Bon dia tingui, senyor Felip.\n", 30),
+        ("Va venir la Maria.\n", len(TEXT)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\n",
+        TEXT.encode(),
+        "Àvia.\nSense salt de línia al final".encode(),
+        b"Windows.\r\nMac antic.\rUnix.\n\r\n",
+        b"Acaba en retorn.\r",
+    ],
+)
+def test_read_mapped_lines_reads_like_open(tmp_path, data):
+    path = tmp_path / "frases.txt"
+    path.write_bytes(data)
+
+    lines = list(read_mapped_lines(path))
+
+    with open(path, "r") as f:
+        assert [line for line, _ in lines] == f.readlines()
+    # every offset is the one after its line, where the next line starts
+    for (_, offset), (line, _) in zip(lines, lines[1:]):
+        assert list(read_mapped_lines(path, offset))[0][0] == line
+    if lines:
+        assert lines[-1][1] == len(data)
+
+
+def test_read_mapped_lines_counts_offsets_in_bytes(tmp_path):
+    path = tmp_path / "frases.txt"
+    path.write_text("És aquí.\nMolt bé.\n", encoding="utf-8")
+
+    assert list(read_mapped_lines(path)) == [("És aquí.\n", 11), ("Molt bé.\n", 21)]
+    assert list(read_mapped_lines(path, 11)) == [("Molt bé.\n", 21)]
+
+
+@pytest.mark.parametrize("name", ["frases.txt", "frases.txt.gz"])
+def test_read_input_lines_from_an_offset(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(
+        gzip.compress(TEXT.encode()) if name.endswith(".gz") else TEXT.encode()
+    )
+
+    lines = list(read_input_lines(path, offsets=True))
+    assert [line for line, _ in lines] == TEXT.splitlines(keepends=True)
+    assert list(read_input_lines(path, lines[0][1], True)) == lines[1:]
+
+
+@pytest.mark.parametrize("name", ["frases.txt.gz", "frases.txt.xz"])
+def test_read_input_lines_counts_compressed_offsets_in_bytes(tmp_path, name):
+    data = "És aquí.\r\nMolt bé.\rFi.\n".encode("utf-8")
+    path = tmp_path / name
+    compress = gzip.compress if name.endswith(".gz") else lzma.compress
+    path.write_bytes(compress(data))
+
+    lines = list(read_input_lines(path, offsets=True))
+
+    assert lines == [("És aquí.\n", 12), ("Molt bé.\n", 22), ("Fi.\n", 26)]
+    assert list(read_input_lines(path, 12, True)) == lines[1:]
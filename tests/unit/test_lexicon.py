@@ -0,0 +1,157 @@
+# mypy: ignore-errors
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from catalan_common_voice_filter.lexicon import (
+    Lexicon,
+    LexiconSpellChecker,
+    describe_lexicon,
+    expand_dictionary,
+    expand_word,
+    read_affix_file,
+    split_flags,
+    write_lexicon,
+)
+
+AFFIX_FILE = """SET UTF-8
+FLAG long
+FULLSTRIP
+FORBIDDENWORD ZZ
+
+PFX _P Y 1
+PFX _P 0 re .
+
+SFX _S Y 2
+SFX _S 0 s [^s]
+SFX _S r ren/_T ar
+
+SFX _T N 1
+SFX _T n va n
+
+SFX _F N 1
+SFX _F 0 -ne .
+"""
+
+DICTIONARY_FILE = """4
+cantar/_S_P_F
+gat/_S
+gats/ZZ
+Barcelona
+"""
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    aff_path = tmp_path / "test.aff"
+    dic_path = tmp_path / "test.dic"
+    aff_path.write_text(AFFIX_FILE)
+    dic_path.write_text(DICTIONARY_FILE)
+    return dic_path, aff_path
+
+
+class FakeDictionary:
+    def __init__(self, words):
+        self.words = words
+        self.calls = 0
+
+    def spell(self, word):
+        self.calls += 1
+        return word in self.words
+
+
+@pytest.mark.parametrize(
+    "flags,flag_type,expected",
+    [
+        ("_S_P", "long", ["_S", "_P"]),
+        ("AB", "char", ["A", "B"]),
+        ("1,22", "num", ["1", "22"]),
+    ],
+)
+def test_split_flags(flags, flag_type, expected):
+    assert split_flags(flags, flag_type) == expected
+
+
+def test_read_affix_file(dictionary):
+    _, aff_path = dictionary
+
+    rules = read_affix_file(aff_path)
+
+    assert rules.flag_type == "long"
+    assert rules.forbidden_flag == "ZZ"
+    assert rules.full_strip
+    assert rules.suffixes["_S"][1].continuation == {"_T"}
+    assert not rules.suffixes["_T"][0].cross_product
+
+
+def test_expand_word(dictionary):
+    _, aff_path = dictionary
+    rules = read_affix_file(aff_path)
+
+    result = expand_word("cantar", ["_S", "_P", "_F"], rules)
+
+    assert result == {
+        "cantar",
+        "cantars",
+        "cantaren",
+        "cantareva",
+        "cantar-ne",
+        "recantar",
+        "recantars",
+        "recantaren",
+    }
+
+
+def test_expand_dictionary_keeps_alphabetic_words_that_are_not_forbidden(dictionary):
+    dic_path, aff_path = dictionary
+
+    result = expand_dictionary(dic_path, aff_path)
+
+    assert "cantar-ne" not in result
+    assert "gat" in result
+    assert "gats" not in result
+    assert "Barcelona" in result
+
+
+def test_lexicon_lookup(tmp_path):
+    words = ["gat", "àvia", "casa", "Barcelona", "cases", "zebra"]
+    path = tmp_path / "test.lexicon"
+
+    assert write_lexicon(path, words + ["gat"]) == len(words)
+
+    lexicon = Lexicon(path)
+    assert len(lexicon) == len(words)
+    for word in words:
+        assert word in lexicon
+    for word in ["", "ga", "gats", "avia", "barcelona", "zzz", "Àvia"]:
+        assert word not in lexicon
+
+
+def test_lexicon_with_another_file(tmp_path):
+    path = tmp_path / "test.lexicon"
+    path.write_bytes(b"not a lexicon")
+
+    with pytest.raises(IOError):
+        Lexicon(path)
+
+
+def test_lexicon_spell_checker_falls_back_to_hunspell(tmp_path):
+    path = tmp_path / "test.lexicon"
+    write_lexicon(path, ["casa", "gat"])
+    dic = FakeDictionary({"Felip", "casa", "gat"})
+    spell_checker = LexiconSpellChecker(Lexicon(Path(path)), dic)
+
+    assert spell_checker.spell("casa")
+    assert spell_checker.spell("Casa")
+    assert not spell_checker.spell("CAsa")
+    assert spell_checker.spell("Felip")
+    assert not spell_checker.spell("kasa")
+    assert dic.calls == 3
+    assert describe_lexicon(spell_checker.counters()) == [
+        "Lexicon: 2 words found, 3 checked by Hunspell"
+    ]
+
+
+def test_describe_lexicon_without_lexicon():
+    assert describe_lexicon(Counter()) == []
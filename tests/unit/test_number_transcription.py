@@ -0,0 +1,215 @@
+# mypy: ignore-errors
+import shutil
+import sys
+from pathlib import Path
+
+import lingua_franca
+import pytest
+
+from catalan_common_voice_filter.number_transcription import (
+    ApertiumPool,
+    NumberTranscriber,
+    describe_number_transcription,
+    find_numbers,
+    spell_number_in_catalan,
+    translate_number_words_to_catalan,
+)
+
+# behaves like "apertium -z": answers every null-terminated block with its upper-cased text
+FAKE_APERTIUM_COMMAND = [
+    sys.executable,
+    "-c",
+    (
+        "import sys\n"
+        "buffer = b''\n"
+        "while True:\n"
+        "    data = sys.stdin.buffer.read1(65536)\n"
+        "    if not data:\n"
+        "        break\n"
+        "    buffer += data\n"
+        "    while b'\\0' in buffer:\n"
+        "        block, buffer = buffer.split(b'\\0', 1)\n"
+        "        sys.stdout.buffer.write(block.upper() + b'\\n\\0')\n"
+        "        sys.stdout.buffer.flush()\n"
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def load_english():
+    lingua_franca.load_language("en")
+
+
+def read_number_corpus():
+    with open(Path("tests/data/numeros_prova.txt"), "r") as f:
+        return [int(number) for number in f.read().splitlines()]
+
+
+@pytest.mark.parametrize(
+    "number,expected",
+    [
+        (3, "tres"),
+        (21, "vint un"),
+        (101, "un cent i un"),
+        (1567, "quinze seixanta set"),
+        (1872, "divuit setanta dos"),
+        (2024, "dos mil, vint quatre"),
+        (1000000, "un milió"),
+    ],
+)
+def test_spell_number_in_catalan(number, expected):
+    result = spell_number_in_catalan(number)
+
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "number,expected",
+    [(1, "primer"), (3, "tercer"), (21, "vint primer"), (1000, "milè")],
+)
+def test_spell_number_in_catalan_with_ordinals(number, expected):
+    result = spell_number_in_catalan(number, ordinals=True)
+
+    assert result == expected
+
+
+def test_translate_number_words_to_catalan_with_unknown_word():
+    with pytest.raises(IOError):
+        translate_number_words_to_catalan("one quadrillion")
+
+
+def test_spell_number_in_catalan_with_number_too_big_to_pronounce():
+    with pytest.raises(IOError):
+        spell_number_in_catalan(10**36)
+
+
+def test_spell_number_in_catalan_covers_number_corpus():
+    for number in read_number_corpus():
+        assert spell_number_in_catalan(number)
+
+
+def test_find_numbers():
+    result = find_numbers(["Del 1872 al 1567.", "Va venir a les 3h.", "Sense xifres"])
+
+    assert result == [3, 1567, 1872]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_apertium_pool_translates_batches_in_order(workers):
+    pool = ApertiumPool(workers, FAKE_APERTIUM_COMMAND)
+    texts = [f"number {i}" for i in range(10)]
+
+    try:
+        result = pool.translate(texts)
+    finally:
+        pool.close()
+
+    assert result == [text.upper() for text in texts]
+    assert len(describe_number_transcription(pool.counters())) == workers + 1
+
+
+def test_apertium_pool_restarts_dead_worker():
+    pool = ApertiumPool(1, FAKE_APERTIUM_COMMAND)
+    worker = pool.workers[0]
+
+    try:
+        worker._process.kill()
+        worker._process.wait()
+        result = pool.translate(["one", "two"])
+    finally:
+        pool.close()
+
+    assert result == ["ONE", "TWO"]
+    assert worker.restarts == 1
+    assert worker.counters()["restarts"] == 1
+
+
+def test_apertium_pool_splits_large_batches_into_several_requests():
+    pool = ApertiumPool(1, FAKE_APERTIUM_COMMAND)
+    texts = ["one thousand, eight hundred and seventy two"] * 1000
+
+    try:
+        result = pool.translate(texts)
+    finally:
+        pool.close()
+
+    assert len(result) == len(texts)
+    assert pool.workers[0].requests > 1
+
+
+def test_number_transcriber_with_native_backend():
+    transcriber = NumberTranscriber("native")
+
+    assert transcriber(1872) == "divuit setanta dos"
+    assert transcriber.pool is None
+
+
+def test_number_transcriber_uses_prefetched_translations():
+    transcriber = NumberTranscriber("apertium", 1, FAKE_APERTIUM_COMMAND)
+
+    try:
+        transcriber.prefetch([3, 21])
+        assert transcriber(3) == "THREE"
+        assert transcriber(21) == "TWENTY ONE"
+        assert transcriber.pool.workers[0].requests == 1
+
+        assert transcriber(4) == "FOUR"
+        assert transcriber.pool.workers[0].requests == 2
+    finally:
+        transcriber.close()
+
+
+def test_number_transcriber_caches_numbers_and_hours():
+    transcriber = NumberTranscriber("native")
+
+    assert transcriber(3) == "tres"
+    assert transcriber(3, True) == "tres hores"
+    assert transcriber(3) == "tres"
+    assert transcriber.cache.hits == 1
+    assert transcriber.cache.misses == 2
+
+
+def test_number_transcriber_persistent_cache_survives_reruns(tmp_path):
+    cache_path = tmp_path / "numbers.sqlite3"
+    transcriber = NumberTranscriber(
+        "apertium", 1, FAKE_APERTIUM_COMMAND, cache_path=cache_path
+    )
+    try:
+        assert transcriber(1872) == "EIGHTEEN SEVENTY TWO"
+    finally:
+        transcriber.close()
+
+    transcriber = NumberTranscriber(
+        "apertium", 1, FAKE_APERTIUM_COMMAND, cache_path=cache_path
+    )
+    try:
+        transcriber.prefetch([1872])
+        assert transcriber(1872) == "EIGHTEEN SEVENTY TWO"
+        assert transcriber.pool.workers[0].requests == 0
+        assert transcriber.persistent_cache.hits == 1
+        assert "1 hits" in describe_number_transcription(transcriber.counters())[1]
+    finally:
+        transcriber.close()
+
+
+def test_describe_number_transcription_merges_worker_counters():
+    counters = NumberTranscriber("native").counters()
+    counters.update({"cache hits": 3, "cache misses": 1})
+    counters.update({"cache hits": 1, "cache misses": 1})
+
+    assert describe_number_transcription(counters) == [
+        "Number transcription cache: 4 hits, 2 misses (66.67%)"
+    ]
+
+
+@pytest.mark.skipif(shutil.which("apertium") is None, reason="apertium not installed")
+def test_native_and_apertium_backends_agree():
+    numbers = read_number_corpus()
+    apertium_transcriber = NumberTranscriber("apertium", apertium_workers=2)
+
+    try:
+        apertium_transcriber.prefetch(numbers)
+        for number in numbers:
+            assert spell_number_in_catalan(number) == apertium_transcriber(number)
+    finally:
+        apertium_transcriber.close()
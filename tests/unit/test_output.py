@@ -0,0 +1,166 @@
+# mypy: ignore-errors
+import gzip
+import threading
+
+import pytest
+
+from catalan_common_voice_filter import input_files, output
+from catalan_common_voice_filter.output import (
+    CaseStudyFile,
+    CategoryFile,
+    compress_file,
+    get_output_path,
+    run_in_threads,
+    sort_file,
+    write_lines,
+)
+
+
+def test_category_file(tmp_path):
+    category_file = CategoryFile(tmp_path / "selected.txt")
+    category_file.append("Frase original.")
+    category_file.append("Una altra frase.")
+    category_file.close()
+
+    assert len(category_file) == 2
+    assert (tmp_path / "selected.txt").read_text() == (
+        "Frase original.\nUna altra frase.\n"
+    )
+
+
+def test_case_study_file(tmp_path):
+    case_study_file = CaseStudyFile(tmp_path / "case_study.tsv")
+    case_study_file.append(["Va venir la Maria.", "Maria"])
+    case_study_file.close()
+
+    assert len(case_study_file) == 1
+    assert (tmp_path / "case_study.tsv").read_text() == "Maria\tVa venir la Maria.\n"
+
+
+def test_category_file_keeps_the_lines_flushed_before_resuming(tmp_path):
+    category_file = CategoryFile(tmp_path / "selected.txt")
+    category_file.append("Frase original.")
+    size = category_file.flush()
+    category_file.append("Frase perduda.")
+    category_file.close()
+
+    category_file = CategoryFile(tmp_path / "selected.txt", size, 1)
+    category_file.append("Una altra frase.")
+    category_file.close()
+
+    assert len(category_file) == 2
+    assert (tmp_path / "selected.txt").read_text() == (
+        "Frase original.\nUna altra frase.\n"
+    )
+
+
+@pytest.mark.parametrize("run_size", [1, 2, 3, 100])
+def test_sort_file_sorts_like_a_list(tmp_path, run_size):
+    lines = ["Zebra.", "abc", "abc\td", "", "Àvia.", "abc d", "Bon dia.", "Zebra."]
+    path = tmp_path / "results.txt"
+    path.write_text("".join(line + "\n" for line in lines))
+
+    sort_file(path, run_size)
+
+    assert path.read_text().split("\n")[:-1] == sorted(lines)
+    assert [file.name for file in tmp_path.iterdir()] == ["results.txt"]
+
+
+def test_sort_file_with_empty_file(tmp_path):
+    path = tmp_path / "results.txt"
+    path.write_text("")
+
+    sort_file(path)
+
+    assert path.read_text() == ""
+
+
+def test_sort_file_with_compression(tmp_path):
+    path = tmp_path / "results.txt"
+    path.write_text("Zebra.\nÀvia.\nBon dia.\n")
+
+    sort_file(path, 2, "gz")
+
+    assert [file.name for file in tmp_path.iterdir()] == ["results.txt.gz"]
+    with gzip.open(tmp_path / "results.txt.gz", "rt") as f:
+        assert f.read() == "Bon dia.\nZebra.\nÀvia.\n"
+
+
+def test_get_output_path(tmp_path):
+    assert get_output_path(tmp_path / "results.txt") == tmp_path / "results.txt"
+    assert get_output_path(tmp_path / "results.txt", "zst") == (
+        tmp_path / "results.txt.zst"
+    )
+
+
+@pytest.mark.parametrize("lines", [[], ["Bon dia."], ["a", "b", "c", "d", "e"]])
+def test_write_lines(tmp_path, monkeypatch, lines):
+    # small buffers, so the lines are written in several buffers
+    monkeypatch.setattr(output, "WRITE_BUFFER_LINES", 2)
+    path = tmp_path / "results.txt"
+
+    write_lines(path, iter(lines))
+
+    assert path.read_text() == "".join(line + "\n" for line in lines)
+
+
+def test_write_lines_with_gzip(tmp_path):
+    write_lines(tmp_path / "results.txt", ["Bon dia.", "Àvia."], "gz")
+
+    assert [file.name for file in tmp_path.iterdir()] == ["results.txt.gz"]
+    with gzip.open(tmp_path / "results.txt.gz", "rt") as f:
+        assert f.read() == "Bon dia.\nÀvia.\n"
+
+
+def test_write_lines_with_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    write_lines(tmp_path / "results.txt", ["Bon dia.", "Àvia."], "zst")
+
+    with zstandard.open(tmp_path / "results.txt.zst", "rt") as f:
+        assert f.read() == "Bon dia.\nÀvia.\n"
+
+
+def test_write_lines_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(input_files, "zstandard", None)
+
+    with pytest.raises(IOError, match="write"):
+        write_lines(tmp_path / "results.txt", ["Bon dia."], "zst")
+
+
+def test_write_lines_with_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        write_lines(tmp_path / "results.txt", ["Bon dia."], "rar")
+
+
+def test_compress_file(tmp_path):
+    path = tmp_path / "results.txt"
+    path.write_text("Bon dia.\n")
+
+    compress_file(path, "gz")
+
+    assert [file.name for file in tmp_path.iterdir()] == ["results.txt.gz"]
+    assert gzip.decompress((tmp_path / "results.txt.gz").read_bytes()) == (
+        b"Bon dia.\n"
+    )
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_run_in_threads(threads):
+    done = []
+    lock = threading.Lock()
+
+    def task(number):
+        with lock:
+            done.append(number)
+
+    run_in_threads([lambda number=number: task(number) for number in range(5)], threads)
+
+    assert sorted(done) == [0, 1, 2, 3, 4]
+
+
+def test_run_in_threads_raises_the_errors_of_the_tasks():
+    def fail():
+        raise IOError("disk full")
+
+    with pytest.raises(IOError):
+        run_in_threads([fail, fail], 2)
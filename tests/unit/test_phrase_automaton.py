@@ -0,0 +1,60 @@
+# mypy: ignore-errors
+import pytest
+
+from catalan_common_voice_filter.phrase_automaton import (
+    PhraseAutomaton,
+    is_word_boundary,
+)
+
+
+@pytest.mark.parametrize(
+    "text,index,expected",
+    [
+        ("la col·lecció", -1, True),
+        ("la col·lecció", 2, True),
+        ("la col·lecció", 6, False),
+        ("l'home", 1, True),
+        ("la col·lecció", 13, True),
+        ("la col·lecció", 4, False),
+    ],
+)
+def test_is_word_boundary(text, index, expected):
+    assert is_word_boundary(text, index) == expected
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Era un mal parit de cap a peus.", "mal parit"),
+        ("Va dir fill de puta i se'n va anar.", "fill de puta"),
+        ("Era un fill de la seva mare.", None),
+        ("Un animal paritori no és el mateix.", None),
+        ("Era un mal paritori.", None),
+        ("Fill de puta, va dir.", None),
+        ("L'home mal parit va marxar.", "mal parit"),
+        ("Va dir fill de puta i mal parit.", "fill de puta"),
+        ("Era un cap de suro.", "cap de suro"),
+    ],
+)
+def test_find(text, expected):
+    automaton = PhraseAutomaton(["mal parit", "fill de puta", "cap de suro", "de suro"])
+
+    assert automaton.find(text) == expected
+
+
+def test_find_the_longest_phrase_that_starts_first():
+    automaton = PhraseAutomaton(["de puta", "fill de", "fill de puta"])
+
+    assert automaton.find("Era un fill de puta.") == "fill de puta"
+
+
+def test_find_with_casefold():
+    automaton = PhraseAutomaton(["Mal Parit"], casefold=True)
+
+    assert automaton.find("MAL PARIT, va cridar.") == "Mal Parit"
+    assert PhraseAutomaton(["Mal Parit"]).find("MAL PARIT, va cridar.") is None
+
+
+def test_len():
+    assert len(PhraseAutomaton(["mal parit", "fill de puta"])) == 2
+    assert len(PhraseAutomaton([])) == 0
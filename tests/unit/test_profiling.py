@@ -0,0 +1,128 @@
+# mypy: ignore-errors
+import json
+import time
+
+from catalan_common_voice_filter import profiling
+from catalan_common_voice_filter.profiling import (
+    Profile,
+    collect_function_profile,
+    describe_profile,
+    profile_stage,
+    start_function_profiling,
+    write_profile,
+)
+
+
+def test_profile_stage():
+    profile = Profile()
+
+    with profile.stage("prefilter", 3):
+        time.sleep(0.01)
+    with profile.stage("prefilter", 2):
+        pass
+
+    assert profile.seconds["prefilter"] >= 0.01
+    assert profile.calls["prefilter"] == 5
+
+
+def test_profile_stage_excluding():
+    profile = Profile()
+
+    with profile.stage("token checks", excluding="spaCy"):
+        with profile.stage("spaCy"):
+            time.sleep(0.05)
+
+    assert profile.seconds["spaCy"] >= 0.05
+    assert profile.seconds["token checks"] < 0.05
+
+
+def test_profile_stage_without_profile():
+    with profile_stage(None, "prefilter"):
+        pass
+
+
+def test_time_iterator():
+    profile = Profile()
+
+    items = list(profile.time_iterator("read and split", iter(["a", "b", "c"])))
+
+    assert items == ["a", "b", "c"]
+    assert profile.calls["read and split"] == 3
+    assert "read and split" in profile.seconds
+
+
+def test_update():
+    profile = Profile()
+    profile.add("spaCy", 1.5, 10)
+    profile.add_rejection("prefilter", "excluded_characters")
+    other = Profile()
+    other.add("spaCy", 0.5, 5)
+    other.add_rejection("prefilter", "excluded_characters")
+    other.add_rejection("token checks", "excluded_spellings")
+    other.function_seconds["filter_phrases.check_tokens"] = 2.0
+    other.function_calls["filter_phrases.check_tokens"] = 4
+
+    profile.update(other)
+
+    assert profile.seconds["spaCy"] == 2.0
+    assert profile.calls["spaCy"] == 15
+    assert profile.rejections == {
+        "prefilter": {"excluded_characters": 2},
+        "token checks": {"excluded_spellings": 1},
+    }
+    assert profile.function_seconds["filter_phrases.check_tokens"] == 2.0
+    assert profile.function_calls["filter_phrases.check_tokens"] == 4
+
+
+def test_collect_function_profile(monkeypatch):
+    monkeypatch.setattr(profiling, "_function_profiler", None)
+    profile = Profile()
+    start_function_profiling()
+    with profile.stage("prefilter"):
+        pass
+
+    collect_function_profile(profile)
+    profiling._function_profiler[1].disable()
+
+    assert profile.function_calls["profiling.stage"] >= 1
+    assert not any(
+        function.startswith("time.") or function.startswith("contextlib.")
+        for function in profile.function_seconds
+    )
+
+
+def test_describe_profile():
+    profile = Profile()
+    profile.add("spaCy", 1.25, 10)
+    profile.add_rejection("token checks", "excluded_spellings")
+    profile.add_rejection("token checks", "excluded_spellings")
+    profile.add_rejection("token checks", "excluded_verbs")
+    profile.function_seconds["filter_phrases.check_tokens"] = 2.0
+    profile.function_calls["filter_phrases.check_tokens"] = 4
+
+    assert describe_profile(profile) == [
+        "Profile stage spaCy: 1.25 s, 10 calls",
+        "Profile stage token checks: 3 sentences rejected "
+        "(excluded_spellings: 2, excluded_verbs: 1)",
+        "Profile function filter_phrases.check_tokens: 2.0 s cumulative, 4 calls",
+    ]
+    assert describe_profile(None) == []
+
+
+def test_write_profile(tmp_path):
+    profile = Profile()
+    profile.add("spaCy", 1.25, 10)
+    profile.add_rejection("prefilter", "excluded_characters")
+    profile.function_seconds["filter_phrases.check_tokens"] = 2.0
+    profile.function_calls["filter_phrases.check_tokens"] = 4
+
+    write_profile(tmp_path / "profile.json", profile)
+
+    with open(tmp_path / "profile.json") as f:
+        assert json.load(f) == {
+            "stages": {"spaCy": {"seconds": 1.25, "calls": 10}},
+            "rejections": {"prefilter": {"excluded_characters": 1}},
+            "functions": {
+                "filter_phrases.check_tokens": {"cumulative_seconds": 2.0, "calls": 4}
+            },
+        }
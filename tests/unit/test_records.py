@@ -0,0 +1,80 @@
+# mypy: ignore-errors
+import json
+
+import pytest
+
+from catalan_common_voice_filter.records import SentenceRecord, open_record_file
+
+RECORDS = [
+    SentenceRecord("frases.txt", 1, 0, "Bon dia.", "Bon dia.", True, None, [], None),
+    SentenceRecord(
+        "frases.txt",
+        2,
+        9,
+        "Va dir merda",
+        None,
+        False,
+        "excluded_words",
+        ["excluded_words"],
+        "merda",
+    ),
+    SentenceRecord(
+        "-",
+        3,
+        None,
+        "no, no",
+        None,
+        False,
+        "excluded_lowercase",
+        [
+            "excluded_lowercase",
+            "possible_breaks",
+        ],
+        None,
+    ),
+]
+
+
+def write_records(path, record_format):
+    record_file = open_record_file(path, record_format)
+    for record in RECORDS:
+        record_file.append(record)
+    assert len(record_file) == len(RECORDS)
+    record_file.close()
+
+
+def test_jsonl_records(tmp_path):
+    path = tmp_path / "records.jsonl"
+    write_records(path, "jsonl")
+
+    with open(path, encoding="utf-8") as f:
+        records = [SentenceRecord(**json.loads(line)) for line in f]
+    assert records == RECORDS
+
+
+def test_parquet_records(tmp_path, monkeypatch):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    # small batches, so the records are written in several row groups
+    monkeypatch.setattr("catalan_common_voice_filter.records.RECORD_BATCH_SIZE", 2)
+    path = tmp_path / "records.parquet"
+    write_records(path, "parquet")
+
+    parquet_file = pyarrow_parquet.ParquetFile(path)
+    assert parquet_file.num_row_groups == 2
+    records = [SentenceRecord(**row) for row in parquet_file.read().to_pylist()]
+    assert records == RECORDS
+
+
+def test_arrow_records(tmp_path):
+    pyarrow_ipc = pytest.importorskip("pyarrow.ipc")
+    path = tmp_path / "records.arrow"
+    write_records(path, "arrow")
+
+    with pyarrow_ipc.open_file(path) as reader:
+        table = reader.read_all()
+    assert [SentenceRecord(**row) for row in table.to_pylist()] == RECORDS
+
+
+def test_open_record_file_with_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_record_file(tmp_path / "records.csv", "csv")
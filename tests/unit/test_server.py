@@ -0,0 +1,60 @@
+# mypy: ignore-errors
+import pytest
+
+from catalan_common_voice_filter.server import (
+    ServerMetrics,
+    read_content_length,
+    read_sentences_from_request,
+)
+
+
+def test_read_sentences_from_request():
+    body = '{"sentences": ["Hola, com estàs?", "Bon dia."]}'.encode()
+
+    assert read_sentences_from_request(body) == ["Hola, com estàs?", "Bon dia."]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"not json", b'["Bon dia."]', b'{"sentence": "Bon dia."}', b'{"sentences": [1]}'],
+)
+def test_read_sentences_from_request_rejects_malformed_requests(body):
+    with pytest.raises(ValueError):
+        read_sentences_from_request(body)
+
+
+@pytest.mark.parametrize("header,expected", [(None, 0), ("0", 0), ("12", 12)])
+def test_read_content_length(header, expected):
+    assert read_content_length(header) == expected
+
+
+@pytest.mark.parametrize("header", ["", "dotze", "-1", "1.5"])
+def test_read_content_length_rejects_invalid_headers(header):
+    with pytest.raises(ValueError):
+        read_content_length(header)
+
+
+def test_server_metrics():
+    metrics = ServerMetrics()
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        metrics.record_request(seconds, 10)
+    metrics.record_error()
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["requests"] == 4
+    assert snapshot["sentences"] == 40
+    assert snapshot["errors"] == 1
+    assert snapshot["average_latency_ms"] == 250.0
+    assert snapshot["p50_latency_ms"] == 300.0
+    assert snapshot["p95_latency_ms"] == 400.0
+    assert snapshot["sentences_per_second"] == 40.0
+
+
+def test_server_metrics_without_requests():
+    snapshot = ServerMetrics().snapshot()
+
+    assert snapshot["requests"] == 0
+    assert snapshot["average_latency_ms"] == 0.0
+    assert snapshot["p95_latency_ms"] == 0.0
+    assert snapshot["sentences_per_second"] == 0.0
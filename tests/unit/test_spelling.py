@@ -0,0 +1,59 @@
+# mypy: ignore-errors
+from collections import Counter
+
+from catalan_common_voice_filter.spelling import (
+    CachedSpellChecker,
+    describe_spelling,
+    read_word_frequency_list,
+)
+
+
+class FakeDictionary:
+    def __init__(self, words):
+        self.words = words
+        self.calls = 0
+
+    def spell(self, word):
+        self.calls += 1
+        return word in self.words
+
+
+def test_cached_spell_checker_only_spells_a_word_once():
+    dic = FakeDictionary({"casa", "gos"})
+    spell_checker = CachedSpellChecker(dic)
+
+    assert spell_checker.spell("casa")
+    assert not spell_checker.spell("kasa")
+    assert spell_checker.spell("casa")
+    assert not spell_checker.spell("kasa")
+    assert dic.calls == 2
+    assert spell_checker.counters() == Counter(
+        {"spelling cache hits": 2, "spelling cache misses": 2}
+    )
+
+
+def test_cached_spell_checker_warm_up_keeps_the_most_frequent_words():
+    dic = FakeDictionary({"de", "la", "que"})
+    spell_checker = CachedSpellChecker(dic, cache_size=2)
+
+    spell_checker.warm_up(["de", "la", "que"])
+    spell_checker.spell("xyz")
+
+    assert "de" in spell_checker.cache
+    assert "la" not in spell_checker.cache
+    assert "que" not in spell_checker.cache
+    assert spell_checker.spell("de")
+    assert dic.calls == 3
+
+
+def test_read_word_frequency_list(tmp_path):
+    path = tmp_path / "frequencies.tsv"
+    path.write_text("de\t1000\nla\t800\n\nque\nels\t10\n")
+
+    assert read_word_frequency_list(path, 4) == ["de", "la", "que"]
+
+
+def test_describe_spelling():
+    counters = Counter({"spelling cache hits": 3, "spelling cache misses": 1})
+
+    assert describe_spelling(counters) == ["Spelling cache: 3 hits, 1 misses (75.0%)"]
@@ -0,0 +1,63 @@
+# mypy: ignore-errors
+from collections import Counter
+
+from catalan_common_voice_filter.verdict_store import (
+    VerdictStore,
+    create_fingerprint,
+    describe_verdict_store,
+    hash_file,
+)
+
+
+def test_hash_file(tmp_path):
+    (tmp_path / "a.txt").write_text("paraula\n")
+    (tmp_path / "b.txt").write_text("paraula\n")
+    (tmp_path / "c.txt").write_text("una altra paraula\n")
+
+    assert hash_file(tmp_path / "a.txt") == hash_file(tmp_path / "b.txt")
+    assert hash_file(tmp_path / "a.txt") != hash_file(tmp_path / "c.txt")
+
+
+def test_create_fingerprint(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("paraula\n")
+    fingerprint = create_fingerprint(["numbers=True"], [path])
+
+    assert fingerprint == create_fingerprint(["numbers=True"], [path])
+    assert fingerprint != create_fingerprint(["numbers=False"], [path])
+
+    path.write_text("una altra paraula\n")
+    assert fingerprint != create_fingerprint(["numbers=True"], [path])
+
+
+def test_verdict_store(tmp_path):
+    verdict_store = VerdictStore(tmp_path / "verdicts.sqlite3", "configuration")
+    verdict_store.put("Bon dia.", ["Bon dia.", [], "Bon dia.", None])
+
+    assert verdict_store.get("Bon dia.") == ["Bon dia.", [], "Bon dia.", None]
+    assert verdict_store.get("Bona nit.") is None
+    assert verdict_store.counters() == Counter(
+        {"verdict store hits": 1, "verdict store misses": 1}
+    )
+    verdict_store.close()
+
+
+def test_verdict_store_is_shared_between_runs_with_the_same_fingerprint(tmp_path):
+    verdict_store = VerdictStore(tmp_path / "verdicts.sqlite3", "configuration")
+    verdict_store.put("Hola", ["Hola", ["excluded_sentences_improper_length"]])
+    verdict_store.close()
+
+    verdict_store = VerdictStore(tmp_path / "verdicts.sqlite3", "configuration")
+    assert verdict_store.get("Hola") == ["Hola", ["excluded_sentences_improper_length"]]
+    verdict_store.close()
+
+    verdict_store = VerdictStore(tmp_path / "verdicts.sqlite3", "other configuration")
+    assert verdict_store.get("Hola") is None
+    verdict_store.close()
+
+
+def test_describe_verdict_store():
+    assert describe_verdict_store(Counter()) == []
+    assert describe_verdict_store(
+        Counter({"verdict store hits": 3, "verdict store misses": 2})
+    ) == ["Verdict store: 3 verdicts reused, 2 sentences filtered"]